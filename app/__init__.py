@@ -27,14 +27,32 @@ def create_app():
 
     # Enable CORS for the frontend (React)
     # CORS(app, resources={r"/*":{"origins":["http://localhost:5173"]}})
-    CORS(app, origins=["http://localhost:5173", "https://thuranirakathiai.vercel.app"], supports_credentials=True)
+    CORS(app, origins=["http://localhost:5173", "https://thuranirakathiai.vercel.app"], supports_credentials=True,
+         expose_headers=["X-Next-Cursor"])
+
+    # Per-backend engine tuning (pool sizing, SQLite pragmas, pool counters)
+    from .services import db_engine
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = db_engine.engine_options(app.config)
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        db_engine.init_app(app, db.engine)
+        # Per-route latency / SQL counters, served at /api/metrics
+        from .services import metrics
+        metrics.init_app(app, db.engine)
     bcrypt.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
 
+    from .services import authz, cache, live, locations, login_guard, write_behind
+    cache.init_app(app)
+    authz.init_app(app)
+    login_guard.init_app(app)
+    locations.init_app(app)
+    live.init_app(app)
+    write_behind.init_app(app)
+
     from app import models
 
 
@@ -52,6 +70,10 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix="/api/admin")
     app.register_blueprint(hero_bp, url_prefix="/api/hero")
 
+    # CLI maintenance commands
+    from .commands import register_commands
+    register_commands(app)
+
     # Simple health route
     @app.route("/")
     def home():
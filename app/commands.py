@@ -0,0 +1,175 @@
+# ==============================================
+# app/commands.py
+# Maintenance commands exposed through the Flask CLI
+#   flask rebuild-rollups
+#   flask check-query-plans
+#   flask rebuild-reason-terms
+#   flask compact-trend-buckets / flask rebuild-trend-buckets
+#   flask merge-location-variants
+#   flask seed
+# ==============================================
+
+import click
+import random
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from app.database import db
+from app.services import location_registry, rollups, query_plans, reason_terms, seed, trends
+from app.services.cache import mark_changed
+
+
+# 🟣 Recompute the dashboard rollups from the raw feedback rows
+@click.command("rebuild-rollups")
+@with_appcontext
+def rebuild_rollups_command():
+    """Recompute the feedback rollup counters from the feedback table."""
+    groups = rollups.rebuild_rollups()
+    click.echo(f"Rebuilt feedback rollups: {groups} groups.")
+
+
+# 🟣 Recount "No"-reason terms from the raw feedback rows
+@click.command("rebuild-reason-terms")
+@with_appcontext
+def rebuild_reason_terms_command():
+    """Recompute the per-location reason term / bigram counters."""
+    processed = reason_terms.rebuild_reason_terms()
+    click.echo(f"Rebuilt reason terms from {processed} reasons.")
+
+
+def _hourly_retention_start(hours):
+    if hours is None:
+        hours = current_app.config.get("TREND_HOURLY_RETENTION_HOURS", 72)
+    return datetime.utcnow() - timedelta(hours=hours)
+
+
+# 🟣 Fold old hourly trend buckets into daily ones (run from cron)
+@click.command("compact-trend-buckets")
+@click.option("--keep-hours", type=int, default=None,
+              help="Hours of hourly buckets to keep (default TREND_HOURLY_RETENTION_HOURS).")
+@with_appcontext
+def compact_trend_buckets_command(keep_hours):
+    """Compact hourly trend buckets older than the retention window into daily buckets."""
+    compacted = trends.compact_buckets(_hourly_retention_start(keep_hours))
+    click.echo(f"Compacted {compacted} hourly buckets.")
+
+
+# 🟣 Recompute the trend buckets from the raw feedback rows
+@click.command("rebuild-trend-buckets")
+@click.option("--keep-hours", type=int, default=None,
+              help="Hours of hourly buckets to keep (default TREND_HOURLY_RETENTION_HOURS).")
+@with_appcontext
+def rebuild_trend_buckets_command(keep_hours):
+    """Recompute the hourly/daily trend buckets from the feedback table."""
+    processed = trends.rebuild_buckets(_hourly_retention_start(keep_hours))
+    click.echo(f"Rebuilt trend buckets from {processed} responses.")
+
+
+# 🟣 Assert that every hot query is served through an index
+@click.command("check-query-plans")
+@click.option("--verbose", "-v", is_flag=True, help="Print the plan for every query.")
+@with_appcontext
+def check_query_plans_command(verbose):
+    """EXPLAIN the hot route queries and fail if a filtered one scans a table or a whole index."""
+    results = query_plans.check_query_plans()
+    failed = [r for r in results if not r["uses_index"]]
+
+    for r in results:
+        status = "ok" if r["uses_index"] else "FULL SCAN"
+        click.echo(f"[{status}] {r['query']}")
+        if verbose or not r["uses_index"]:
+            for line in r["plan"].splitlines():
+                click.echo(f"    {line}")
+
+    if failed:
+        raise click.ClickException(f"{len(failed)} hot queries scan instead of using an index lookup.")
+    click.echo(f"All {len(results)} hot queries use an index.")
+
+
+# 🟣 One-off clean-up: fold spelling variants of the same location together
+@click.command("merge-location-variants")
+@click.option("--dry-run", is_flag=True, help="Only list the variants that would be merged.")
+@with_appcontext
+def merge_location_variants_command(dry_run):
+    """Merge locations that differ only in case, spacing or punctuation, then rebuild the counters."""
+    merges = location_registry.merge_variants(current_app.config.get("LOCATION_REGISTRY_PATH"), dry_run=dry_run)
+    for merge in merges:
+        variants = ", ".join(" / ".join(names) for names in merge["merged"])
+        click.echo(f"{' / '.join(merge['into'])} <- {variants} ({merge['responses']} responses)")
+
+    if dry_run or not merges:
+        click.echo(f"{len(merges)} locations to merge." if dry_run else "No location variants found.")
+        return
+
+    rollups.rebuild_rollups()
+    reason_terms.rebuild_reason_terms()
+    trends.rebuild_buckets(_hourly_retention_start(None))
+    click.echo(f"Merged variants into {len(merges)} locations; rebuilt rollups, reason terms and trend buckets.")
+
+
+# 🟣 Load-test data: synthetic feedback responses and slides
+@click.command("seed")
+@click.option("--count", type=int, default=100000, show_default=True, help="Feedback rows to insert.")
+@click.option("--seed", "random_seed", type=int, default=None, help="Random seed (repeatable data).")
+@click.option("--batch-size", type=int, default=100000, show_default=True, help="Rows per INSERT batch.")
+@click.option("--yes-ratio", type=float, default=0.6, show_default=True, help="Share of 'Yes' answers.")
+@click.option("--reason-ratio", type=float, default=0.7, show_default=True, help="Share of 'No' answers with a reason.")
+@click.option("--skew", type=float, default=1.1, show_default=True, help="Zipf exponent of the location popularity (0 = uniform).")
+@click.option("--age-weights", default="35,30,22,13", show_default=True, help="Relative weights of 18-28,29-40,41-55,56+.")
+@click.option("--days", type=int, default=60, show_default=True, help="Spread created_at over this many past days.")
+@click.option("--locations", "shape", default="4,5,8", show_default=True,
+              help="Subcounties,wards,villages when no location registry is configured.")
+@click.option("--slides", type=int, default=0, show_default=True, help="Slides to insert as well.")
+@with_appcontext
+def seed_command(count, random_seed, batch_size, yes_ratio, reason_ratio, skew, age_weights, days, shape, slides):
+    """Insert synthetic feedback (and slides) for load testing, then rebuild the counters."""
+    try:
+        weights = [float(w) for w in age_weights.split(",")]
+        subcounties, wards, villages = (int(n) for n in shape.split(","))
+    except ValueError:
+        raise click.BadParameter("expected comma-separated numbers")
+    if len(weights) != len(seed.AGE_BRACKETS):
+        raise click.BadParameter(f"expected {len(seed.AGE_BRACKETS)} age weights", param_hint="--age-weights")
+
+    rng = random.Random(random_seed)
+    location_keys = seed.registry_locations(current_app.config.get("LOCATION_REGISTRY_PATH"))
+    if location_keys is None:
+        location_keys = seed.synthetic_locations(subcounties, wards, villages)
+
+    if count > 0:
+        started = time.perf_counter()
+        with seed.bulk_load() as single_transaction:
+            rate = seed.seed_feedback(
+                count, rng, location_keys, yes_ratio=yes_ratio, reason_ratio=reason_ratio, skew=skew,
+                age_weights=weights, days=days, batch_size=batch_size, commit_batches=not single_transaction,
+                progress=lambda done: click.echo(f"\r  {done}/{count}", nl=False),
+            )
+        click.echo()
+        elapsed = time.perf_counter() - started
+        click.echo(f"Inserted {count} feedback rows over {len(location_keys)} locations "
+                   f"({rate:,.0f} rows/s inserting, {count / elapsed:,.0f} rows/s "
+                   f"or {elapsed:.1f}s with the index rebuild).")
+
+        rollups.rebuild_rollups()
+        reason_terms.rebuild_reason_terms()
+        trends.rebuild_buckets(_hourly_retention_start(None))
+        mark_changed("feedback", "locations")
+        db.session.commit()
+        click.echo("Rebuilt rollups, reason terms and trend buckets.")
+
+    if slides > 0:
+        seed.seed_slides(slides, rng)
+        mark_changed("slides")
+        db.session.commit()
+        click.echo(f"Inserted {slides} slides.")
+
+
+def register_commands(app):
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_reason_terms_command)
+    app.cli.add_command(compact_trend_buckets_command)
+    app.cli.add_command(rebuild_trend_buckets_command)
+    app.cli.add_command(merge_location_variants_command)
+    app.cli.add_command(seed_command)
@@ -1,9 +1,11 @@
 # ==============================================
 # app/models.py
-# Defines all database models: Admin, Feedback, Slideshow
+# Defines all database models: Admin, Location, Feedback, FeedbackRollup,
+# ReasonTerm, FeedbackBucket, Slideshow, DataVersion
 # ==============================================
 
 from datetime import datetime
+from flask import current_app
 from .database import db
 from flask_bcrypt import generate_password_hash, check_password_hash
 
@@ -28,9 +30,10 @@ class Admin(db.Model):
         self.set_password(password)
         self.role = role
 
-    # 🟣 Set password (hashed)
+    # 🟣 Set password (hashed, cost from BCRYPT_LOG_ROUNDS)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.password_hash = generate_password_hash(password, rounds).decode("utf-8")
 
     # 🟣 Check password
     def check_password(self, password):
@@ -41,21 +44,142 @@ class Admin(db.Model):
         return f"<Admin {self.username} ({self.role})>"
 
 
-# 🗳️ FEEDBACK MODEL (for storing voter responses)
-class Feedback(db.Model):
-    __tablename__ = "feedback"
+# 📍 LOCATION MODEL (subcounty -> ward -> village, one row per village)
+class Location(db.Model):
+    __tablename__ = "locations"
 
     id = db.Column(db.Integer, primary_key=True)
     subcounty = db.Column(db.String(100), nullable=False)
     ward = db.Column(db.String(100), nullable=False)
     village = db.Column(db.String(100), nullable=False)
+    # Normalized names (app/services/locations.py normalize), so spelling
+    # variants of one place cannot become separate rows
+    subcounty_key = db.Column(db.String(100), nullable=False)
+    ward_key = db.Column(db.String(100), nullable=False)
+    village_key = db.Column(db.String(100), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("subcounty", "ward", "village", name="uq_locations_subcounty_ward_village"),
+        db.UniqueConstraint("subcounty_key", "ward_key", "village_key", name="uq_locations_name_keys"),
+        # Location filters on feedback resolve to ids through these
+        db.Index("ix_locations_ward", "ward", "village"),
+        db.Index("ix_locations_village", "village"),
+    )
+
+    def __repr__(self):
+        return f"<Location {self.subcounty} / {self.ward} / {self.village}>"
+
+
+# 🗳️ FEEDBACK MODEL (for storing voter responses)
+class Feedback(db.Model):
+    __tablename__ = "feedback"
+
+    id = db.Column(db.Integer, primary_key=True)
+    location_id = db.Column(db.Integer, db.ForeignKey("locations.id"), nullable=False)
     age_bracket = db.Column(db.String(20), nullable=False)
     will_vote = db.Column(db.Boolean, nullable=False)  # True for Yes, False for No
     reason = db.Column(db.Text, nullable=True)  # If 'No', the reason or suggestion
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    location = db.relationship("Location")
+
+    # Indexes follow the query shapes in app/routes (see app/services/query_plans.py)
+    __table_args__ = (
+        db.Index("ix_feedback_created_at", "created_at"),
+        # Covers the rollup rebuild without touching rows (and the location_id FK)
+        db.Index("ix_feedback_location_vote", "location_id", "age_bracket", "will_vote"),
+        db.Index(
+            "ix_feedback_no_reasons", "created_at", "id",
+            sqlite_where=db.and_(will_vote == False, reason.isnot(None)),
+            postgresql_where=db.and_(will_vote == False, reason.isnot(None)),
+        ),
+        # Keyset pages of "No" reasons filtered by subcounty / ward / village
+        db.Index(
+            "ix_feedback_no_reasons_location", "location_id", "created_at", "id",
+            sqlite_where=db.and_(will_vote == False, reason.isnot(None)),
+            postgresql_where=db.and_(will_vote == False, reason.isnot(None)),
+        ),
+    )
+
     def __repr__(self):
-        return f"<Feedback {self.subcounty} - {'Yes' if self.will_vote else 'No'}>"
+        return f"<Feedback {self.location_id} - {'Yes' if self.will_vote else 'No'}>"
+
+
+# 📊 FEEDBACK ROLLUP MODEL (pre-aggregated counters for the dashboard)
+class FeedbackRollup(db.Model):
+    """
+    One row per (subcounty, ward, village, age_bracket) group.
+    Kept in step with the feedback table by app/services/rollups.py so the
+    dashboard breakdowns read a handful of groups instead of every response.
+    """
+    __tablename__ = "feedback_rollups"
+
+    subcounty = db.Column(db.String(100), primary_key=True)
+    ward = db.Column(db.String(100), primary_key=True)
+    village = db.Column(db.String(100), primary_key=True)
+    age_bracket = db.Column(db.String(20), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    yes_count = db.Column(db.Integer, nullable=False, default=0)
+    no_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_feedback_rollups_ward", "ward", "village"),
+        # Covering index for the single-query overview in app/services/stats.py
+        db.Index("ix_feedback_rollups_counts", "subcounty", "total", "yes_count", "no_count"),
+        db.Index("ix_feedback_rollups_village", "village"),
+    )
+
+    def __repr__(self):
+        return f"<FeedbackRollup {self.subcounty}/{self.ward}/{self.village} ({self.age_bracket}): {self.total}>"
+
+
+# 🔤 REASON TERM MODEL (per-location term / bigram counts from "No" reasons)
+class ReasonTerm(db.Model):
+    """
+    How many "No" reasons in a village mention a term (ngram=1) or an
+    adjacent word pair (ngram=2). Maintained by app/services/reason_terms.py.
+    """
+    __tablename__ = "reason_terms"
+
+    subcounty = db.Column(db.String(100), primary_key=True)
+    ward = db.Column(db.String(100), primary_key=True)
+    village = db.Column(db.String(100), primary_key=True)
+    ngram = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_reason_terms_ngram", "ngram", "term", "count"),
+        db.Index("ix_reason_terms_ward", "ward", "village", "ngram"),
+        db.Index("ix_reason_terms_village", "village", "ngram"),
+    )
+
+    def __repr__(self):
+        return f"<ReasonTerm {self.village} '{self.term}': {self.count}>"
+
+
+# 📈 FEEDBACK BUCKET MODEL (yes/no counts per time bucket for trend charts)
+class FeedbackBucket(db.Model):
+    """
+    Yes/no counts per subcounty per hour (granularity="hour") or per day
+    (granularity="day", after compaction). Times are UTC bucket starts.
+    Maintained by app/services/trends.py.
+    """
+    __tablename__ = "feedback_buckets"
+
+    granularity = db.Column(db.String(5), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    subcounty = db.Column(db.String(100), primary_key=True)
+    yes_count = db.Column(db.Integer, nullable=False, default=0)
+    no_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Trend reads filter on time across both granularities
+        db.Index("ix_feedback_buckets_start", "bucket_start", "subcounty"),
+    )
+
+    def __repr__(self):
+        return f"<FeedbackBucket {self.granularity} {self.bucket_start} {self.subcounty}>"
 
 
 # 🖼️ SLIDESHOW MODEL (for admin-managed slideshow images)
@@ -69,6 +193,11 @@ class Slideshow(db.Model):
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=False)  # 🟣 NEW FIELD
 
+    __table_args__ = (
+        db.Index("ix_slides_is_active", "is_active", "uploaded_at"),
+        db.Index("ix_slides_uploaded_by", "uploaded_by"),
+    )
+
     admin = db.relationship("Admin", backref="slides")
 
     def __repr__(self):
@@ -78,4 +207,20 @@ class Slideshow(db.Model):
 
 class HeroImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    image_url = db.Column(db.String(255))
\ No newline at end of file
+    image_url = db.Column(db.String(255))
+
+
+# 🔁 DATA VERSION MODEL (shared change counters for cross-worker cache coherence)
+class DataVersion(db.Model):
+    """
+    One counter per cached data domain ("feedback", "slides", "hero", "admins").
+    Every write bumps its domain in the same transaction; each gunicorn worker
+    compares the counters with the versions its cached responses were built from.
+    """
+    __tablename__ = "data_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion {self.name}={self.version}>"
@@ -2,25 +2,16 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.database import db
 from app.models import Admin
+from app.services.authz import require_role
+from app.services.cache import mark_changed
 from werkzeug.security import generate_password_hash, check_password_hash
 
 admin_bp = Blueprint("admin_bp", __name__, url_prefix="/api/admin")
 
 # 🟣 Get all admins (Super Admin only)
 @admin_bp.route("/all", methods=["GET"])
-@jwt_required()
+@require_role("superadmin")
 def get_all_admins():
-    current_admin = get_jwt_identity()
-    print("JWT identity:", current_admin)
-    admin = Admin.query.filter_by(username=current_admin).first()
-    print("Fetched admin:", admin)
-    # current_admin_identity = get_jwt_identity()
-    # username = current_admin_identity["username"]
-    # admin = Admin.query.filter_by(username=username).first()
-
-    if not admin or not admin.is_super:
-        return jsonify({"error": "Unauthorized"}), 403
-
     admins = Admin.query.all()
     data = [{"id": a.id, "username": a.username, "is_super": a.is_super} for a in admins]
     return jsonify(data), 200
@@ -28,15 +19,8 @@ def get_all_admins():
 
 # 🟣 Add new admin
 @admin_bp.route("/add", methods=["POST"])
-@jwt_required()
+@require_role("superadmin")
 def add_admin():
-    current_admin = get_jwt_identity()
-    
-    admin = Admin.query.filter_by(username=current_admin).first()
-
-    if not admin or not admin.is_super:
-        return jsonify({"error": "Unauthorized"}), 403
-
     data = request.get_json()
     username = data.get("username")
     password = data.get("password")
@@ -48,10 +32,10 @@ def add_admin():
     if Admin.query.filter_by(username=username).first():
         return jsonify({"error": "Admin already exists"}), 400
 
-    hashed_pw = generate_password_hash(password)
     role="superadmin" if is_super else "admin"
     new_admin = Admin(username=username, password=password, role=role)
     db.session.add(new_admin)
+    mark_changed("admins")
     db.session.commit()
 
     return jsonify({"message": f"Admin '{username}' added successfully."}), 201
@@ -59,19 +43,14 @@ def add_admin():
 
 # 🟣 Remove an admin (Super Admin only)
 @admin_bp.route("/<int:id>", methods=["DELETE"])
-@jwt_required()
+@require_role("superadmin")
 def remove_admin(id):
-    current_admin = get_jwt_identity()
-    admin = Admin.query.filter_by(username=current_admin).first()
-
-    if not admin or not admin.is_super:
-        return jsonify({"error": "Unauthorized"}), 403
-
     target = Admin.query.get(id)
     if not target:
         return jsonify({"error": "Admin not found"}), 404
 
     db.session.delete(target)
+    mark_changed("admins")
     db.session.commit()
     return jsonify({"message": f"Admin '{target.username}' removed successfully."}), 200
 
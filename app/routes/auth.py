@@ -6,7 +6,7 @@
 #  - JWT Token handling
 # ==========================================
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import (
     create_access_token, jwt_required,
     get_jwt_identity
@@ -15,11 +15,18 @@ from datetime import timedelta
 from app.models import Admin
 from app.database import db
 from flask_bcrypt import check_password_hash, generate_password_hash
+from app.services.login_guard import PoolFull, needs_rehash
 
 # Blueprint setup
 auth_bp = Blueprint('auth_bp', __name__, url_prefix='/api/auth')
 
 
+def _too_many_requests(retry_after):
+    response = jsonify({"error": "Too many login attempts, try again later"})
+    response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return response, 429
+
+
 # -----------------------------
 # 🟣 LOGIN ROUTE
 # -----------------------------
@@ -32,11 +39,31 @@ def login():
     if not username or not password:
         return jsonify({"error": "Username and password are required"}), 400
 
+    # Throttle per IP and per username before spending any bcrypt time
+    guard = current_app.extensions["login_guard"]
+    wait = guard.admit(request, str(username))
+    if wait:
+        return _too_many_requests(wait)
+
     admin = Admin.query.filter_by(username=username).first()
 
-    if not admin or not check_password_hash(admin.password_hash, password):
+    try:
+        valid = admin is not None and guard.pool.run(check_password_hash, admin.password_hash, password)
+    except PoolFull:
+        return _too_many_requests(1)
+
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
+    rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+    if needs_rehash(admin.password_hash, rounds):
+        # Cost changed since this hash was made: upgrade it while we have the password
+        try:
+            admin.password_hash = guard.pool.run(generate_password_hash, password, rounds).decode("utf-8")
+            db.session.commit()
+        except PoolFull:
+            pass  # try again on a later login
+
     # Create JWT Token valid for 1 day
     # access_token = create_access_token(
     #     identity={"id": admin.id, "role": admin.role, "username": admin.username},
@@ -1,135 +1,150 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app, stream_with_context
 from sqlalchemy import func,case
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.database import db
-from app.models import Feedback, Slideshow,Admin
+from app.models import Feedback, Location, Slideshow,Admin
+from app.services import aggregation, db_engine, live, reason_terms, reasons, stats, trends
+from app.services.authz import require_role
+from app.services.cache import cached, response_cache
+from app.services.feedback_filters import parse_datetime
+from app.services.http_cache import conditional
 
 dashboard_bp = Blueprint("dashboard_bp", __name__, url_prefix="/api/dashboard")
 
 # ✅ Summary route (Total responses, Yes, No)
 @dashboard_bp.route("/summary", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
 def get_summary():
-    total = Feedback.query.count()
-    total_yes = Feedback.query.filter_by(will_vote=True).count()
-    total_no = Feedback.query.filter_by(will_vote=False).count()
+    overview = stats.overview()
 
     return jsonify({
-        "total_feedback": total,
-        "total_yes": total_yes,
-        "total_no": total_no
+        "total_feedback": overview["total_feedback"],
+        "total_yes": overview["total_yes"],
+        "total_no": overview["total_no"]
     }), 200
 
 
-# ✅ Breakdown by Subcounty
-@dashboard_bp.route("/by-subcounty", methods=["GET"])
-def get_by_subcounty():
-    results = db.session.query(
-        Feedback.subcounty,
-        func.count(Feedback.id).label("total"),
-        func.sum(case((Feedback.will_vote == True, 1), else_=0)).label("yes_count"),
-        func.sum(case((Feedback.will_vote == False, 1), else_=0)).label("no_count")
-    ).group_by(Feedback.subcounty).all()
+# ✅ Combined overview (summary + quick stats in one query)
+@dashboard_bp.route("/overview", methods=["GET"])
+@conditional("feedback", "admins", cache_control="private, no-cache")
+@cached("feedback", "admins")
+def get_overview():
+    overview = stats.overview()
+    latest_feedback = overview["latest_feedback"]
+    overview["latest_feedback"] = latest_feedback.isoformat() if latest_feedback else None
 
-    data = []
-    for row in results:
-        data.append({
-            "subcounty": row.subcounty,
-            "total": row.total,
-            "yes_count": int(row.yes_count or 0),
-            "no_count": int(row.no_count or 0)
-        })
-
-    return jsonify(data), 200
+    return jsonify(overview), 200
 
 
+# ✅ Breakdown by Subcounty
+@dashboard_bp.route("/by-subcounty", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def get_by_subcounty():
+    return jsonify(aggregation.breakdown("subcounty")), 200
 
 
 # 🟣 Breakdown by Ward
 @dashboard_bp.route("/by-ward", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
 def get_by_ward():
-    results = (
-        db.session.query(
-            Feedback.ward,
-            db.func.count(Feedback.id).label("total"),
-            db.func.sum(db.case((Feedback.will_vote == True, 1), else_=0)).label("yes_count"),
-            db.func.sum(db.case((Feedback.will_vote == False, 1), else_=0)).label("no_count"),
-        )
-        .group_by(Feedback.ward)
-        .all()
-    )
-
-    data = []
-    for r in results:
-        data.append({
-            "ward": r.ward,
-            "total": int(r.total),
-            "yes_count": int(r.yes_count),
-            "no_count": int(r.no_count)
-        })
-    return jsonify(data), 200
-
-
-
+    return jsonify(aggregation.breakdown("ward")), 200
 
 
 # 🟣 Breakdown by Village
 @dashboard_bp.route("/by-village", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
 def get_by_village():
-    results = (
-        db.session.query(
-            Feedback.village,
-            db.func.count(Feedback.id).label("total"),
-            db.func.sum(db.case((Feedback.will_vote == True, 1), else_=0)).label("yes_count"),
-            db.func.sum(db.case((Feedback.will_vote == False, 1), else_=0)).label("no_count"),
-        )
-        .group_by(Feedback.village)
-        .all()
-    )
+    return jsonify(aggregation.breakdown("village")), 200
 
-    data = []
-    for r in results:
-        data.append({
-            "village": r.village,
-            "total": int(r.total),
-            "yes_count": int(r.yes_count),
-            "no_count": int(r.no_count)
-        })
+
+
+# 🟣 Aggregate over any dimension hierarchy in one round trip
+@dashboard_bp.route("/aggregate", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def get_aggregate():
+    """
+    Query args:
+      dims=subcounty,ward,village   (any of subcounty, ward, village, age_bracket)
+      subcounty=..., ward=..., village=..., age_bracket=...   (optional filters)
+    Returns the whole hierarchy, e.g.
+    {"dimensions": ["subcounty", "ward"], "total": 15, "yes_count": 11, "no_count": 4,
+     "children": [{"subcounty": "Muthara", "total": 10, ..., "children": [{"ward": "Kathwana", ...}]}]}
+    """
+    try:
+        dims = aggregation.parse_dimensions(request.args.get("dims", "subcounty"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = {d: request.args[d] for d in aggregation.DIMENSIONS if request.args.get(d)}
+    data = {"dimensions": list(dims)}
+    data.update(aggregation.aggregate(dims, filters))
     return jsonify(data), 200
 
 
+# 🟣 Age bracket x location cross-tab
+@dashboard_bp.route("/pivot", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def get_pivot():
+    """
+    Query args: by=subcounty|ward|village (default subcounty),
+    optional subcounty / ward / village filters.
+    Returns dimension arrays plus count matrices (rows = age brackets):
+    {"by": "subcounty", "age_brackets": [...], "locations": [...],
+     "total": [[...]], "yes_count": [[...]], "no_count": [[...]]}
+    """
+    filters = {d: request.args[d] for d in ("subcounty", "ward", "village") if request.args.get(d)}
+    try:
+        data = aggregation.pivot(request.args.get("by", "subcounty"), filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(data), 200
+
 
 # ✅ Quick Stats for Admin Overview
 @dashboard_bp.route("/quick-stats", methods=["GET"])
+@conditional("feedback", "admins", cache_control="private, no-cache")
+@cached("feedback", "admins")
 def get_quick_stats():
-    total_admins = Admin.query.count()
-    total_feedback = Feedback.query.count()
-    total_subcounties = db.session.query(Feedback.subcounty).distinct().count()
-    latest_feedback = db.session.query(func.max(Feedback.created_at)).scalar()
+    overview = stats.overview()
+    latest_feedback = overview["latest_feedback"]
 
     return jsonify({
-        "total_admins": total_admins,
-        "total_feedback": total_feedback,
-        "total_subcounties": total_subcounties,
+        "total_admins": overview["total_admins"],
+        "total_feedback": overview["total_feedback"],
+        "total_subcounties": overview["total_subcounties"],
         "latest_feedback": latest_feedback.isoformat() if latest_feedback else None
     }), 200
 
 
 # 🟣 Breakdown of "No" vote reasons by Ward & Village
 @dashboard_bp.route("/no-reasons", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
 def get_no_reasons():
     """
-    Returns list of reasons given by users who voted 'No',
-    grouped by ward and village for admin insights.
+    Returns one page of reasons given by users who voted 'No',
+    with their ward and village for admin insights, newest first.
+    Query args: limit, cursor, ward, village, subcounty.
+    The cursor for the next page is in the X-Next-Cursor header (absent on the last page).
     """
-    results = (
-        db.session.query(
-            Feedback.ward,
-            Feedback.village,
-            Feedback.reason
+    try:
+        limit = reasons.parse_limit(
+            request.args.get("limit"),
+            current_app.config.get("REASONS_PAGE_SIZE", 100),
+            current_app.config.get("REASONS_MAX_PAGE_SIZE", 500),
         )
-        .filter(Feedback.will_vote == False, Feedback.reason.isnot(None))
-        .all()
-    )
+        results, next_cursor = reasons.page_no_reasons(
+            (Location.ward, Location.village, Feedback.reason), request.args, limit
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     data = []
     for r in results:
@@ -139,4 +154,106 @@ def get_no_reasons():
             "reason": r.reason
         })
 
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return jsonify(data), 200, headers
+
+
+# 🟣 Top terms behind "No" votes for a location scope
+@dashboard_bp.route("/reason-terms", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def get_reason_terms():
+    """
+    Query args: subcounty, ward, village (optional scope), limit (default 20, max 100)
+    {"terms": [{"term": "id", "count": 40}, ...], "bigrams": [{"term": "id card", "count": 31}, ...]}
+    """
+    try:
+        limit = reasons.parse_limit(request.args.get("limit"), 20, 100)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = {k: request.args[k] for k in ("subcounty", "ward", "village") if request.args.get(k)}
+    return jsonify(reason_terms.top_terms(filters, limit)), 200
+
+
+# 🟣 Yes/No trend over time
+@dashboard_bp.route("/trend", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def get_trend():
+    """
+    Query args:
+      interval=hour|day|week (default day)
+      subcounty=...          (optional filter)
+      by=subcounty           (optional: one series per subcounty)
+      since, until           (ISO dates/datetimes, UTC, until exclusive)
+    [{"bucket": "2026-10-12T00:00:00", "yes_count": 40, "no_count": 12, "total": 52}, ...]
+    """
+    try:
+        since = parse_datetime("since", request.args["since"]) if request.args.get("since") else None
+        until = parse_datetime("until", request.args["until"]) if request.args.get("until") else None
+        data = trends.trend(
+            interval=request.args.get("interval", "day"),
+            subcounty=request.args.get("subcounty"),
+            by_subcounty=request.args.get("by") == "subcounty",
+            since=since,
+            until=until,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     return jsonify(data), 200
+
+
+# 🟣 Response cache hit/miss counters
+@dashboard_bp.route("/cache-stats", methods=["GET"])
+@require_role("admin", "superadmin")
+def get_cache_stats():
+    return jsonify(response_cache.stats()), 200
+
+
+# 🟣 Database connection pool counters
+@dashboard_bp.route("/pool-stats", methods=["GET"])
+@require_role("admin", "superadmin")
+def get_pool_stats():
+    return jsonify(db_engine.pool_stats(db.engine)), 200
+
+
+# 🟣 Live counts over Server-Sent Events (replaces polling /summary and /by-*)
+@dashboard_bp.route("/stream", methods=["GET"])
+@require_role("admin", "superadmin", locations=["headers", "query_string"])
+def stream_dashboard():
+    """
+    Needs an admin JWT: Authorization header, or ?jwt=<token> for EventSource.
+    text/event-stream of:
+      event: snapshot / resync   data: {"total": 15, "yes": 11, "no": 4}
+      event: feedback            data: {"yes": 1, "no": 0, "deltas": [
+          {"subcounty": "Muthara", "ward": "Kathwana", "village": "Kanyuru", "yes": 1, "no": 0}]}
+    plus ": heartbeat" comments. Reconnects send Last-Event-ID (or
+    ?last_event_id=) and get the missed events, or a fresh snapshot.
+    """
+    config = current_app.config
+    if not live.broker.open_stream(config.get("LIVE_MAX_STREAMS", 4)):
+        return jsonify({"error": "Too many live dashboards open, please retry"}), 503, {"Retry-After": "5"}
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    events = live.stream(
+        last_event_id,
+        heartbeat=config.get("LIVE_HEARTBEAT_INTERVAL", 15.0),
+        check_interval=config.get("DATA_VERSION_CHECK_INTERVAL", 1.0),
+    )
+    response = current_app.response_class(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Released when the server closes the response, even if it never started streaming
+    response.call_on_close(live.broker.close_stream)
+    return response
+
+
+# 🟣 Live stream broker counters
+@dashboard_bp.route("/stream-stats", methods=["GET"])
+@require_role("admin", "superadmin")
+def get_stream_stats():
+    return jsonify(live.broker.stats()), 200
@@ -4,9 +4,15 @@
 # Aligned with the Feedback model (uses will_vote: Boolean)
 # ================================================
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
 from app.database import db
 from app.models import Feedback
+from app.services import aggregation, changes, export, ingest, reasons, search, stats
+from app.services.feedback_filters import feedback_conditions
+from app.services.authz import require_role
+from app.services.cache import cached
+from app.services.http_cache import conditional
 
 feedback_bp = Blueprint("feedback_bp", __name__, url_prefix="/api/feedback")
 
@@ -15,6 +21,8 @@ feedback_bp = Blueprint("feedback_bp", __name__, url_prefix="/api/feedback")
 @feedback_bp.route("/submit", methods=["POST"])
 def submit_feedback():
     """
+    Returns 201 once stored, or 202 when FEEDBACK_WRITE_BEHIND is on and the
+    record was queued (503 + Retry-After if the queue is full).
     Accepts a JSON payload with:
     {
       "subcounty": "Muthara",
@@ -28,56 +36,96 @@ def submit_feedback():
 
     data = request.get_json()
 
-    # Extract fields safely
-    subcounty = data.get("subcounty")
-    ward = data.get("ward")
-    village = data.get("village")
-    age_bracket = data.get("age_bracket")
-    vote_input = data.get("will_vote")  # Expecting 'Yes' or 'No'
-    reason = data.get("reason", None)
-
-    # Validate required fields
-    if not all([subcounty, ward, village, age_bracket, vote_input]):
-        return jsonify({"error": "All fields are required"}), 400
-
-    # Convert 'Yes'/'No' to Boolean
-    will_vote = True if vote_input.lower() == "yes" else False
-
-    # Create and save feedback entry
-    feedback = Feedback(
-        subcounty=subcounty,
-        ward=ward,
-        village=village,
-        age_bracket=age_bracket,
-        will_vote=will_vote,
-        reason=reason
-    )
-
-    db.session.add(feedback)
+    record, error = ingest.validate_feedback(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Write-behind mode: queue it and let the flusher batch the insert
+    buffer = current_app.extensions.get("feedback_buffer")
+    if buffer is not None:
+        if not buffer.offer(record):
+            return jsonify({"error": "Too many submissions right now, please retry"}), 503, {"Retry-After": "1"}
+        return jsonify({"message": "Feedback received"}), 202
+
+    ingest.save_feedback([record])
     db.session.commit()
 
     return jsonify({"message": "Feedback submitted successfully"}), 201
 
 
+# 🟣 Bulk Submit (field-agent batch sync)
+@feedback_bp.route("/bulk", methods=["POST"])
+def submit_feedback_bulk():
+    """
+    Accepts {"records": [<submit payload>, ...]} (or a bare JSON list).
+    Every record is validated with the same rules as /submit; valid ones are
+    inserted in chunked multi-row INSERTs and committed together.
+    Returns per-record results:
+    {"accepted": 2, "rejected": 1, "results": [
+        {"index": 0, "status": "accepted"},
+        {"index": 1, "status": "rejected", "error": "All fields are required"}, ...]}
+    """
+    data = request.get_json(silent=True)
+    records = data.get("records") if isinstance(data, dict) else data
+
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "A non-empty list of records is required"}), 400
+
+    max_records = current_app.config.get("FEEDBACK_BULK_MAX_RECORDS", 5000)
+    if len(records) > max_records:
+        return jsonify({"error": f"At most {max_records} records per request"}), 413
+
+    accepted, results = [], []
+    for index, item in enumerate(records):
+        record, error = ingest.validate_feedback(item)
+        if error:
+            results.append({"index": index, "status": "rejected", "error": error})
+        else:
+            accepted.append(record)
+            results.append({"index": index, "status": "accepted"})
+
+    if accepted:
+        ingest.save_feedback(accepted, chunk_size=current_app.config.get("FEEDBACK_BULK_CHUNK_SIZE", 500))
+        db.session.commit()
+
+    return jsonify({
+        "accepted": len(accepted),
+        "rejected": len(records) - len(accepted),
+        "results": results
+    }), 201 if accepted else 400
+
+
+# 🟣 Write-behind buffer counters
+@feedback_bp.route("/buffer-stats", methods=["GET"])
+@require_role("admin", "superadmin")
+def get_buffer_stats():
+    buffer = current_app.extensions.get("feedback_buffer")
+    if buffer is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify(dict(buffer.stats(), enabled=True)), 200
+
+
 # 🟣 Get Summary Totals
 @feedback_bp.route("/summary", methods=["GET"])
+@conditional("feedback", cache_control="no-cache")
+@cached("feedback")
 def get_summary():
     """
     Returns total counts of Yes/No votes and total responses
     """
-    total_yes = Feedback.query.filter_by(will_vote=True).count()
-    total_no = Feedback.query.filter_by(will_vote=False).count()
-    total = Feedback.query.count()
+    overview = stats.overview()
 
     return jsonify({
-        "total_yes": total_yes,
-        "total_no": total_no,
-        "total_responses": total
+        "total_yes": overview["total_yes"],
+        "total_no": overview["total_no"],
+        "total_responses": overview["total_feedback"]
     }), 200
 
 
 # 🟣 Get Breakdown by Region (Subcounty)
 @feedback_bp.route("/by-region", methods=["GET"])
+@conditional("feedback", cache_control="no-cache")
+@cached("feedback")
 def get_by_region():
     """
     Returns breakdown of feedback by subcounty:
@@ -86,27 +134,7 @@ def get_by_region():
       {"subcounty": "Tigania East", "total": 5, "yes_count": 3, "no_count": 2}
     ]
     """
-    results = (
-        db.session.query(
-            Feedback.subcounty,
-            db.func.count(Feedback.id).label("total"),
-            db.func.sum(db.case((Feedback.will_vote == True, 1), else_=0)).label("yes_count"),
-            db.func.sum(db.case((Feedback.will_vote == False, 1), else_=0)).label("no_count"),
-        )
-        .group_by(Feedback.subcounty)
-        .all()
-    )
-
-    data = []
-    for r in results:
-        data.append({
-            "subcounty": r.subcounty,
-            "total": r.total,
-            "yes_count": int(r.yes_count or 0),
-            "no_count": int(r.no_count or 0),
-        })
-
-    return jsonify(data), 200
+    return jsonify(aggregation.breakdown("subcounty")), 200
 
 
 
@@ -114,21 +142,119 @@ def get_by_region():
 
 # 🟣 Get Reasons for "No" Votes
 @feedback_bp.route("/reasons", methods=["GET"])
+@conditional("feedback", cache_control="no-cache")
+@cached("feedback")
 def get_no_reasons():
     """
-    Returns a list of reasons provided by users who voted 'No'.
+    Returns one page of reasons provided by users who voted 'No', newest first.
     [
         {"reason": "No access to polling station"},
         {"reason": "Lack of ID"},
         {"reason": "Disinterest in politics"}
     ]
+    Query args: limit, cursor, ward, village, subcounty.
+    The cursor for the next page is in the X-Next-Cursor header (absent on the last page).
     """
-    results = (
-        db.session.query(Feedback.reason)
-        .filter(Feedback.will_vote == False, Feedback.reason.isnot(None))
-        .all()
-    )
+    try:
+        limit = reasons.parse_limit(
+            request.args.get("limit"),
+            current_app.config.get("REASONS_PAGE_SIZE", 100),
+            current_app.config.get("REASONS_MAX_PAGE_SIZE", 500),
+        )
+        results, next_cursor = reasons.page_no_reasons((Feedback.reason,), request.args, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    data = [{"reason": r.reason} for r in results]
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return jsonify(data), 200, headers
+
+
+# 🟣 Full-text search over reasons
+@feedback_bp.route("/search", methods=["GET"])
+@conditional("feedback", cache_control="private, no-cache")
+@cached("feedback")
+def search_reasons():
+    """
+    Query args:
+      q=ID card "polling station"   (quoted phrases; all terms must match)
+      subcounty, ward, village, will_vote=yes|no   (optional filters)
+      limit (default 20, max 100)
+    Returns matches best first:
+    [{"id": 12, "subcounty": "Muthara", "ward": "Kathwana", "village": "Kanyuru",
+      "will_vote": false, "reason": "...", "created_at": "...", "rank": 3.21}]
+    """
+    try:
+        limit = reasons.parse_limit(request.args.get("limit"), 20, 100)
+        conditions = feedback_conditions(request.args, allowed=("subcounty", "ward", "village", "will_vote"))
+        data = search.search_reasons(request.args.get("q"), conditions, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    data = [{"reason": r.reason} for r in results if r.reason.strip()]
     return jsonify(data), 200
 
+
+# 🟣 Delta sync: feedback added after a cursor
+@feedback_bp.route("/changes", methods=["GET"])
+@jwt_required()
+def get_changes():
+    """
+    Query args:
+      since=<cursor>        last Feedback.id the client has (default 0 = from the start)
+      view=rows|aggregate   raw rows (default) or per-location yes/no deltas
+      limit                 rows per page (bounded by FEEDBACK_CHANGES_MAX_PAGE_SIZE)
+      subcounty, ward, village, will_vote   (optional filters)
+    Returns {"since": 120, "next_cursor": 220, "has_more": true, "rows": [...]}
+    or, for view=aggregate, {..., "count": 100, "yes": 60, "no": 40,
+    "deltas": [{"subcounty": ..., "ward": ..., "village": ..., "yes": 3, "no": 1}]}.
+    Keep calling with since=next_cursor; when has_more is false the client is current.
+    """
+    config = current_app.config
+    view = request.args.get("view", "rows")
+    if view not in ("rows", "aggregate"):
+        return jsonify({"error": "view must be 'rows' or 'aggregate'"}), 400
+
+    maximum = config.get("FEEDBACK_CHANGES_MAX_PAGE_SIZE", 5000)
+    try:
+        since = changes.parse_cursor(request.args.get("since"))
+        limit = reasons.parse_limit(
+            request.args.get("limit"),
+            config.get("FEEDBACK_CHANGES_PAGE_SIZE", 500) if view == "rows" else maximum,
+            maximum,
+        )
+        conditions = feedback_conditions(request.args, allowed=("subcounty", "ward", "village", "will_vote"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if view == "aggregate":
+        data = changes.aggregate_changes(since, conditions, limit)
+    else:
+        data = changes.row_changes(since, conditions, limit)
+    return jsonify(data), 200, {"X-Next-Cursor": str(data["next_cursor"])}
+
+
+# 🟣 Stream raw feedback rows (CSV or NDJSON) for analysts
+@feedback_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_feedback():
+    """
+    Query args:
+      format=csv|ndjson (default csv)
+      subcounty, ward, village, will_vote=yes|no, since, until (ISO, until exclusive)
+    The body is streamed as rows are read, so any export size uses flat memory.
+    """
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in export.FORMATS:
+        return jsonify({"error": "format must be 'csv' or 'ndjson'"}), 400
+
+    try:
+        conditions = feedback_conditions(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    batch_size = current_app.config.get("FEEDBACK_EXPORT_BATCH_SIZE", 1000)
+    body = stream_with_context(export.stream(fmt, conditions, batch_size))
+    return current_app.response_class(body, mimetype=export.FORMATS[fmt], headers={
+        "Content-Disposition": f"attachment; filename=feedback.{fmt}",
+        "Cache-Control": "no-store",
+    })
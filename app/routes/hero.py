@@ -1,15 +1,21 @@
 from flask import Blueprint, request, jsonify
 from app.database import db
 from app.models import HeroImage
+from app.services.authz import require_role
+from app.services.cache import cached, mark_changed
+from app.services.http_cache import conditional
 
 hero_bp = Blueprint("hero_bp", __name__, url_prefix="/api/hero")
 
 @hero_bp.route("/hero", methods=["GET"])
+@conditional("hero", cache_control="no-cache")
+@cached("hero")
 def get_hero():
     hero = HeroImage.query.first()
     return jsonify({"image_url": hero.image_url if hero else None})
 
 @hero_bp.route("/hero", methods=["POST"])
+@require_role("admin", "superadmin")
 def set_hero():
     data = request.get_json()
     image_url = data.get("image_url")
@@ -22,6 +28,7 @@ def set_hero():
         hero.image_url = image_url
     else:
         db.session.add(HeroImage(image_url=image_url))
+    mark_changed("hero")
     db.session.commit()
 
     return jsonify({"message": "Hero image updated successfully!"}), 200
\ No newline at end of file
@@ -4,6 +4,9 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.database import db
 from app.models import Slideshow
+from app.services.authz import require_role
+from app.services.cache import cached, mark_changed
+from app.services.http_cache import conditional
 import os
 from werkzeug.utils import secure_filename
 
@@ -74,6 +77,7 @@ def allowed_file(filename):
 #         db.session.add(slide)
 #         db.session.commit()
 @slideshow_bp.route('/upload', methods=['POST'])
+@require_role("admin", "superadmin")
 def upload_slide_json():
     data = request.get_json()
     image_url = data.get("image_url")
@@ -85,6 +89,7 @@ def upload_slide_json():
 
     slide = Slideshow(image_url=image_url, caption=caption, uploaded_by=uploaded_by)
     db.session.add(slide)
+    mark_changed("slides")
     db.session.commit()
 
     return jsonify({"message": "Slide uploaded successfully", "image_url": image_url}), 201
@@ -101,6 +106,8 @@ def upload_slide_json():
 
 # 🟣 Get All Slides
 @slideshow_bp.route('/', methods=['GET'])
+@conditional("slides", cache_control="private, no-cache")
+@cached("slides")
 def get_slides():
     slides = Slideshow.query.all()
     return jsonify([
@@ -117,15 +124,19 @@ def get_slides():
 
 # 🟣 Toggle Slide Active/Inactive
 @slideshow_bp.route('/<int:id>/toggle', methods=['PATCH'])
+@require_role("admin", "superadmin")
 def toggle_slide(id):
     slide = Slideshow.query.get_or_404(id)
     slide.is_active = not slide.is_active
+    mark_changed("slides")
     db.session.commit()
     return jsonify({"message": "Slide status updated", "is_active": slide.is_active}), 200
 
 
 # 🟣 Get Active Slides for Homepage
 @slideshow_bp.route('/active', methods=['GET'])
+@conditional("slides", cache_control="no-cache")
+@cached("slides")
 def get_active_slides():
     slides = Slideshow.query.filter_by(is_active=True).all()
     return jsonify([
@@ -139,8 +150,10 @@ def get_active_slides():
 
 # 🟣 Delete Slide
 @slideshow_bp.route('/<int:id>', methods=['DELETE'])
+@require_role("admin", "superadmin")
 def delete_slide(id):
     slide = Slideshow.query.get_or_404(id)
     db.session.delete(slide)
+    mark_changed("slides")
     db.session.commit()
     return jsonify({"message": "Slide deleted successfully"}), 200
\ No newline at end of file
@@ -0,0 +1,159 @@
+# ==============================================
+# app/services/aggregation.py
+# Single-scan feedback aggregation over the rollup table
+# - aggregate: full dimension hierarchy (e.g. subcounty > ward > village)
+#   in one query; Postgres uses GROUP BY ROLLUP, other backends group by
+#   the finest level once and roll the prefixes up in Python
+# - breakdown: flat totals for one dimension (used by the /by-* routes)
+# - pivot: age_bracket x location matrices in a column-oriented payload
+# ==============================================
+
+from sqlalchemy import func
+from app.database import db
+from app.models import FeedbackRollup
+
+DIMENSIONS = ("subcounty", "ward", "village", "age_bracket")
+
+
+def parse_dimensions(raw):
+    """Parse "subcounty,ward" into a validated tuple of dimension names."""
+    dims = tuple(d.strip() for d in (raw or "").split(",") if d.strip())
+    if not dims:
+        raise ValueError("At least one dimension is required")
+    unknown = [d for d in dims if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+    if len(set(dims)) != len(dims):
+        raise ValueError("Dimensions must not repeat")
+    return dims
+
+
+def _filtered(query, filters):
+    for name, value in (filters or {}).items():
+        if name not in DIMENSIONS:
+            raise ValueError(f"Unknown filter: {name}")
+        query = query.filter(getattr(FeedbackRollup, name) == value)
+    return query
+
+
+def _counters():
+    return (
+        func.sum(FeedbackRollup.total).label("total"),
+        func.sum(FeedbackRollup.yes_count).label("yes_count"),
+        func.sum(FeedbackRollup.no_count).label("no_count"),
+    )
+
+
+def _rollup_levels(dims, filters):
+    """Postgres: one GROUP BY ROLLUP query returns every prefix level."""
+    columns = [getattr(FeedbackRollup, d) for d in dims]
+    query = db.session.query(
+        *columns, *_counters(), *(func.grouping(c).label(f"g_{d}") for c, d in zip(columns, dims))
+    )
+    query = _filtered(query, filters).group_by(func.rollup(*columns))
+
+    levels = {}
+    for row in query.all():
+        depth = sum(1 for d in dims if getattr(row, f"g_{d}") == 0)
+        key = tuple(getattr(row, d) for d in dims[:depth])
+        levels[key] = (int(row.total or 0), int(row.yes_count or 0), int(row.no_count or 0))
+    return levels
+
+
+def _single_pass_levels(dims, filters):
+    """Fallback: group by the finest level once, then add each row to all its prefixes."""
+    columns = [getattr(FeedbackRollup, d) for d in dims]
+    query = _filtered(db.session.query(*columns, *_counters()), filters).group_by(*columns)
+
+    levels = {(): (0, 0, 0)}
+    for row in query.all():
+        counts = (int(row.total or 0), int(row.yes_count or 0), int(row.no_count or 0))
+        for depth in range(len(dims) + 1):
+            key = tuple(row[:depth])
+            total, yes, no = levels.get(key, (0, 0, 0))
+            levels[key] = (total + counts[0], yes + counts[1], no + counts[2])
+    return levels
+
+
+def _node(counts):
+    total, yes, no = counts
+    return {"total": total, "yes_count": yes, "no_count": no}
+
+
+def _build_tree(dims, levels):
+    children_of = {}
+    for key in levels:
+        if key:
+            children_of.setdefault(key[:-1], []).append(key)
+
+    def build(prefix):
+        node = _node(levels[prefix])
+        depth = len(prefix)
+        if depth < len(dims):
+            children = []
+            for key in sorted(children_of.get(prefix, []), key=lambda k: k[-1]):
+                child = {dims[depth]: key[-1]}
+                child.update(build(key))
+                children.append(child)
+            node["children"] = children
+        return node
+
+    return build(())
+
+
+def aggregate(dims, filters=None):
+    """
+    Aggregate feedback counters along the given dimensions.
+    Returns the root node of the hierarchy:
+    {"total": 15, "yes_count": 11, "no_count": 4, "children": [
+        {"subcounty": "Muthara", "total": 10, ..., "children": [{"ward": "Kathwana", ...}]}
+    ]}
+    Leaf nodes have no "children" key.
+    """
+    dims = tuple(dims)
+    if db.session.get_bind().dialect.name == "postgresql":
+        levels = _rollup_levels(dims, filters)
+    else:
+        levels = _single_pass_levels(dims, filters)
+
+    # Grand total is missing when filters match nothing
+    levels.setdefault((), (0, 0, 0))
+    return _build_tree(dims, levels)
+
+
+def breakdown(dimension, filters=None):
+    """
+    Totals per value of one dimension:
+    [{"<dimension>": "Muthara", "total": 10, "yes_count": 8, "no_count": 2}, ...]
+    """
+    return aggregate((dimension,), filters)["children"]
+
+
+def pivot(dimension, filters=None):
+    """
+    age_bracket x <dimension> cross-tab from one GROUP BY, column-oriented:
+    {"by": "subcounty", "age_brackets": ["18-28", "29-40"], "locations": ["Muthara", ...],
+     "total": [[...], [...]], "yes_count": [[...], [...]], "no_count": [[...], [...]]}
+    Matrix rows follow age_brackets and columns follow locations.
+    """
+    if dimension not in DIMENSIONS or dimension == "age_bracket":
+        raise ValueError("by must be one of: subcounty, ward, village")
+
+    column = getattr(FeedbackRollup, dimension)
+    query = db.session.query(FeedbackRollup.age_bracket, column.label("location"), *_counters())
+    rows = _filtered(query, filters).group_by(FeedbackRollup.age_bracket, column).all()
+
+    age_brackets = sorted({r.age_bracket for r in rows})
+    locations = sorted({r.location for r in rows})
+    row_of = {a: i for i, a in enumerate(age_brackets)}
+    col_of = {l: j for j, l in enumerate(locations)}
+
+    data = {"by": dimension, "age_brackets": age_brackets, "locations": locations}
+    for name in ("total", "yes_count", "no_count"):
+        data[name] = [[0] * len(locations) for _ in age_brackets]
+    for r in rows:
+        i, j = row_of[r.age_bracket], col_of[r.location]
+        data["total"][i][j] = int(r.total or 0)
+        data["yes_count"][i][j] = int(r.yes_count or 0)
+        data["no_count"][i][j] = int(r.no_count or 0)
+    return data
@@ -0,0 +1,122 @@
+# ==============================================
+# app/services/authz.py
+# Role checks for admin-only routes
+# - @require_role("superadmin"): authorize from the verified JWT claims
+#   ("id" and "role", set by auth.login) instead of loading the admin row
+# - the claims are cross-checked against a small TTL cache of admin
+#   records, so a deleted or demoted admin loses access without waiting
+#   for the token to expire
+# - entries are dropped when an admin is deleted or changes role (locally
+#   on commit; in other workers through the "admins" data version)
+# ==============================================
+
+import threading
+import time
+from functools import wraps
+from types import SimpleNamespace
+from flask import g, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from sqlalchemy import event, inspect
+from app.database import db
+from app.models import Admin
+from app.services import versions
+
+
+class AdminCache:
+    """Thread-safe id -> admin record cache with a per-entry TTL."""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._entries = {}  # id -> (expires_at, versions, record or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, admin_id):
+        """{"id", "username", "role"} namespace for admin_id, or None if it no longer exists."""
+        data_versions = versions.snapshot(("admins",))
+        with self._lock:
+            entry = self._entries.get(admin_id)
+            if entry is not None and entry[0] >= time.monotonic() and entry[1] == data_versions:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        admin = db.session.get(Admin, admin_id)
+        record = None
+        if admin is not None:
+            record = SimpleNamespace(id=admin.id, username=admin.username, role=admin.role)
+        with self._lock:
+            self._entries[admin_id] = (time.monotonic() + self.ttl, data_versions, record)
+        return record
+
+    def invalidate(self, *admin_ids):
+        with self._lock:
+            for admin_id in admin_ids:
+                self._entries.pop(admin_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+admin_cache = AdminCache()
+
+
+def require_role(*roles, locations=None):
+    """
+    Allow the view only for a valid JWT whose "role" claim is one of roles
+    and whose admin still exists with that role. The admin record is
+    available to the view as g.current_admin.
+    locations overrides where the token is looked for (e.g. ["headers",
+    "query_string"] for EventSource clients, which cannot set headers).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request(locations=locations)
+            claims = get_jwt()
+            if claims.get("role") not in roles or claims.get("id") is None:
+                return jsonify({"error": "Unauthorized"}), 403
+
+            admin = admin_cache.get(claims["id"])
+            if admin is None or admin.role not in roles:
+                return jsonify({"error": "Unauthorized"}), 403
+
+            g.current_admin = admin
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _after_flush(session, flush_context):
+    changed = [a.id for a in session.deleted if isinstance(a, Admin)]
+    changed += [
+        a.id for a in session.dirty
+        if isinstance(a, Admin) and inspect(a).attrs.role.history.has_changes()
+    ]
+    if changed:
+        session.info.setdefault("changed_admins", set()).update(changed)
+
+
+def _after_commit(session):
+    changed = session.info.pop("changed_admins", None)
+    if changed:
+        admin_cache.invalidate(*changed)
+
+
+def _after_rollback(session):
+    session.info.pop("changed_admins", None)
+
+
+def init_app(app):
+    admin_cache.ttl = app.config.get("ADMIN_CACHE_TTL", 60)
+
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,156 @@
+# ==============================================
+# app/services/cache.py
+# In-process response cache for the read endpoints
+# - @cached("feedback"): cache a GET view's response, keyed by endpoint
+#   and query args, tagged with the data it depends on
+# - mark_changed("feedback"): called by write routes before commit; bumps
+#   the shared data_versions counter in the same transaction and drops the
+#   tagged entries locally once it commits
+# - entries remember the versions they were built from, so a write handled
+#   by another gunicorn worker invalidates them here too
+# - LRU eviction (RESPONSE_CACHE_MAX_ENTRIES) and TTL (RESPONSE_CACHE_TTL)
+# ==============================================
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response, current_app
+from sqlalchemy import event
+from app.database import db
+from app.services import versions
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL and tag-based invalidation."""
+
+    def __init__(self, max_entries=512, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tags, versions, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, data_versions=()):
+        """Return the cached value, or None if missing, expired or built from older data."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic() or entry[2] != data_versions:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[3]
+
+    def set(self, key, value, tags, ttl=None, data_versions=()):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, frozenset(tags), data_versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        """Drop every entry tagged with any of the given tags."""
+        tags = set(tags)
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if entry[1] & tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key():
+    return (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+
+
+def _extra_headers(response):
+    """Application headers (X-*) that must be replayed with a cached body."""
+    return [(k, v) for k, v in response.headers.items() if k.startswith("X-")]
+
+
+def cached(*tags, ttl=None):
+    """
+    Cache a GET view's successful responses.
+    tags name the data the response depends on ("feedback", "slides", ...);
+    any write that calls mark_changed() with one of them drops the entry.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+                return view(*args, **kwargs)
+
+            key = _cache_key()
+            data_versions = versions.snapshot(tags)
+            hit = response_cache.get(key, data_versions)
+            if hit is not None:
+                body, status, mimetype, headers = hit
+                return current_app.response_class(body, status=status, mimetype=mimetype, headers=headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(
+                    key,
+                    (response.get_data(), response.status_code, response.mimetype, _extra_headers(response)),
+                    tags,
+                    ttl,
+                    data_versions,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def mark_changed(*tags):
+    """Record that the current transaction changes data behind these tags."""
+    versions.bump(*tags)
+    db.session.info.setdefault("changed_tags", set()).update(tags)
+
+
+def _after_commit(session):
+    tags = session.info.pop("changed_tags", None)
+    if tags:
+        response_cache.invalidate(*tags)
+        versions.expire()
+
+
+def _after_rollback(session):
+    session.info.pop("changed_tags", None)
+
+
+def init_app(app):
+    response_cache.max_entries = app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 512)
+    response_cache.ttl = app.config.get("RESPONSE_CACHE_TTL", 30)
+    versions.init_app(app)
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,112 @@
+# ==============================================
+# app/services/changes.py
+# Delta sync over Feedback.id for GET /api/feedback/changes
+# - the cursor is the last Feedback.id a client has; each page holds the
+#   rows after it in id order (a primary-key range scan), either as rows
+#   or folded into per-location yes/no deltas
+# - ids become visible in commit order: save_feedback locks the shared
+#   "feedback" data version row before inserting (Postgres; SQLite has a
+#   single writer), so once a row is visible no smaller id can still appear
+#   and the cursor never jumps over a late commit
+# ==============================================
+
+from sqlalchemy import select, func, case
+from app.database import db
+from app.models import Feedback, Location
+
+ROW_COLUMNS = ("id", "subcounty", "ward", "village", "age_bracket", "will_vote", "reason", "created_at")
+LOCATION_COLUMNS = ("subcounty", "ward", "village")
+
+
+def parse_cursor(raw):
+    if raw in (None, ""):
+        return 0
+    try:
+        cursor = int(raw)
+    except ValueError:
+        raise ValueError("since must be a feedback id (integer)")
+    if cursor < 0:
+        raise ValueError("since must not be negative")
+    return cursor
+
+
+def rows_statement(since, conditions, limit):
+    return (
+        select(*(getattr(Location if c in LOCATION_COLUMNS else Feedback, c) for c in ROW_COLUMNS))
+        .join_from(Feedback, Location)
+        .where(Feedback.id > since, *conditions)
+        .order_by(Feedback.id)
+        .limit(limit)
+    )
+
+
+def aggregate_statement(since, upto, conditions):
+    return (
+        select(
+            Location.subcounty,
+            Location.ward,
+            Location.village,
+            func.sum(case((Feedback.will_vote == True, 1), else_=0)).label("yes"),
+            func.sum(case((Feedback.will_vote == True, 0), else_=1)).label("no"),
+        )
+        .join_from(Feedback, Location)
+        .where(Feedback.id > since, Feedback.id <= upto, *conditions)
+        .group_by(Location.id, Location.subcounty, Location.ward, Location.village)
+        .order_by(Location.subcounty, Location.ward, Location.village)
+    )
+
+
+def row_changes(since, conditions, limit):
+    """
+    {"since", "next_cursor", "has_more", "rows": [{<ROW_COLUMNS>}, ...]}
+    next_cursor equals since when there is nothing new.
+    """
+    rows = db.session.execute(rows_statement(since, conditions, limit + 1)).all()
+    page, has_more = rows[:limit], len(rows) > limit
+
+    items = []
+    for row in page:
+        item = dict(zip(ROW_COLUMNS, row))
+        item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+        items.append(item)
+    return {
+        "since": since,
+        "next_cursor": page[-1].id if page else since,
+        "has_more": has_more,
+        "rows": items,
+    }
+
+
+def aggregate_changes(since, conditions, limit):
+    """
+    Per-location yes/no deltas for the next page of rows:
+    {"since", "next_cursor", "has_more", "count",
+     "yes", "no", "deltas": [{"subcounty", "ward", "village", "yes", "no"}, ...]}
+    """
+    ids = (
+        select(Feedback.id)
+        .join_from(Feedback, Location)
+        .where(Feedback.id > since, *conditions)
+        .order_by(Feedback.id)
+        .limit(limit + 1)
+    )
+    rows = db.session.execute(ids).all()
+    page, has_more = rows[:limit], len(rows) > limit
+    if not page:
+        return {"since": since, "next_cursor": since, "has_more": has_more,
+                "count": 0, "yes": 0, "no": 0, "deltas": []}
+
+    upto = page[-1].id
+    deltas = [
+        {"subcounty": r.subcounty, "ward": r.ward, "village": r.village, "yes": int(r.yes), "no": int(r.no)}
+        for r in db.session.execute(aggregate_statement(since, upto, conditions))
+    ]
+    return {
+        "since": since,
+        "next_cursor": upto,
+        "has_more": has_more,
+        "count": len(page),
+        "yes": sum(d["yes"] for d in deltas),
+        "no": sum(d["no"] for d in deltas),
+        "deltas": deltas,
+    }
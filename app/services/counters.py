@@ -0,0 +1,40 @@
+# ==============================================
+# app/services/counters.py
+# Shared "add these deltas to a counter table" upsert
+# Used by the incrementally maintained tables (rollups, reason terms, ...)
+# ==============================================
+
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import db
+
+
+def increment_counters(model, key_columns, counter_columns, rows):
+    """
+    Add each row's counter values to the matching record of model, creating it
+    if needed. key_columns must form the model's primary key.
+    Runs in the caller's session/transaction.
+    """
+    if not rows:
+        return
+
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        db.session.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={c: getattr(model, c) + getattr(stmt.excluded, c) for c in counter_columns},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    # Fallback for backends without ON CONFLICT: lock and bump row by row
+    for row in rows:
+        key = tuple(row[k] for k in key_columns)
+        record = db.session.get(model, key, with_for_update=True)
+        if record is None:
+            db.session.add(model(**row))
+        else:
+            for c in counter_columns:
+                setattr(record, c, getattr(record, c) + row[c])
@@ -0,0 +1,148 @@
+# ==============================================
+# app/services/db_engine.py
+# Per-backend engine tuning, applied by create_app
+# - engine_options: SQLALCHEMY_ENGINE_OPTIONS for the configured backend
+#   (Postgres pool sizing, pre-ping, recycle, statement_timeout)
+# - init_app: SQLite pragmas on every new connection (WAL, synchronous,
+#   busy_timeout, mmap_size, cache_size)
+# - InstrumentedQueuePool / pool_stats: checkout, wait and overflow
+#   counters for sizing the pool against the gunicorn worker count
+# ==============================================
+
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def increment(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "wait_seconds_avg": round(self.wait_total / self.checkouts, 6) if self.checkouts else None,
+            }
+
+
+stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config):
+    """Engine keyword arguments for the configured database (explicit options win)."""
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    options = {}
+
+    if backend == "postgresql":
+        options = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": config.get("DB_POOL_SIZE", 5),
+            "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": config.get("DB_POOL_TIMEOUT", 10),
+            "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        }
+        timeout = config.get("DB_STATEMENT_TIMEOUT", 15000)
+        if timeout:
+            options["connect_args"] = {"options": f"-c statement_timeout={int(timeout)}"}
+
+    elif backend == "sqlite" and not _is_memory_sqlite(url):
+        options = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": config.get("DB_POOL_SIZE", 5),
+            "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": config.get("DB_POOL_TIMEOUT", 10),
+        }
+
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def _sqlite_pragmas(config):
+    pragmas = [
+        ("journal_mode", config.get("DB_SQLITE_JOURNAL_MODE", "WAL")),
+        ("synchronous", config.get("DB_SQLITE_SYNCHRONOUS", "NORMAL")),
+        ("busy_timeout", config.get("DB_SQLITE_BUSY_TIMEOUT", 5000)),
+        ("mmap_size", config.get("DB_SQLITE_MMAP_SIZE", 268435456)),
+        ("cache_size", config.get("DB_SQLITE_CACHE_SIZE", -65536)),
+    ]
+    return [(name, value) for name, value in pragmas if value not in (None, "")]
+
+
+def init_app(app, engine):
+    """Attach the per-connection setup and pool counters to the app's engine."""
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and not _is_memory_sqlite(url):
+        pragmas = _sqlite_pragmas(app.config)
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    event.listen(engine, "connect", lambda *args: stats.increment("connects"))
+    event.listen(engine, "checkin", lambda *args: stats.increment("checkins"))
+
+
+def pool_stats(engine):
+    """Live pool state plus the cumulative checkout / wait counters."""
+    pool = engine.pool
+    data = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    data.update(stats.snapshot())
+    return data
@@ -0,0 +1,74 @@
+# ==============================================
+# app/services/export.py
+# Streaming feedback export (CSV / NDJSON)
+# Rows are fetched in yield_per batches (server-side cursor on Postgres)
+# and encoded chunk by chunk, so memory stays flat for any export size.
+# CSV text cells that a spreadsheet would run as a formula (=, +, -, @, tab,
+# CR) get a leading ' ; NDJSON is written as stored.
+# ==============================================
+
+import csv
+import io
+import json
+from sqlalchemy import select
+from app.database import db
+from app.models import Feedback, Location
+
+EXPORT_COLUMNS = ("id", "subcounty", "ward", "village", "age_bracket", "will_vote", "reason", "created_at")
+LOCATION_COLUMNS = ("subcounty", "ward", "village")
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _rows(conditions, batch_size):
+    stmt = (
+        select(*(getattr(Location if c in LOCATION_COLUMNS else Feedback, c) for c in EXPORT_COLUMNS))
+        .join_from(Feedback, Location)
+        .where(*conditions)
+        .order_by(Feedback.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = db.session.execute(stmt)
+    for partition in result.partitions():
+        yield partition
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(conditions, batch_size=1000):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for partition in _rows(conditions, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(v) for v in row] for row in partition)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(conditions, batch_size=1000):
+    for partition in _rows(conditions, batch_size):
+        lines = []
+        for row in partition:
+            item = dict(zip(EXPORT_COLUMNS, row))
+            item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+            lines.append(json.dumps(item, ensure_ascii=False))
+        yield "\n".join(lines) + "\n"
+
+
+def stream(fmt, conditions, batch_size=1000):
+    if fmt == "csv":
+        return stream_csv(conditions, batch_size)
+    return stream_ndjson(conditions, batch_size)
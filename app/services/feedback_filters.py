@@ -0,0 +1,45 @@
+# ==============================================
+# app/services/feedback_filters.py
+# Query-string filters shared by the feedback listing/export routes
+#   subcounty, ward, village   exact match
+#   will_vote                  "yes" / "no"
+#   since, until               ISO dates/datetimes on created_at (until is exclusive)
+# ==============================================
+
+from datetime import datetime
+from app.models import Feedback
+from app.services.locations import location_condition
+
+LOCATION_FILTERS = ("subcounty", "ward", "village")
+
+
+def parse_datetime(name, value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime")
+
+
+def feedback_conditions(args, allowed=("subcounty", "ward", "village", "will_vote", "since", "until")):
+    """
+    Build SQLAlchemy conditions on Feedback from request args.
+    Raises ValueError for malformed values.
+    """
+    conditions = []
+
+    location = location_condition({name: args.get(name) for name in LOCATION_FILTERS if name in allowed})
+    if location is not None:
+        conditions.append(location)
+
+    vote = args.get("will_vote")
+    if "will_vote" in allowed and vote:
+        if vote.lower() not in ("yes", "no"):
+            raise ValueError("will_vote must be 'yes' or 'no'")
+        conditions.append(Feedback.will_vote == (vote.lower() == "yes"))
+
+    if "since" in allowed and args.get("since"):
+        conditions.append(Feedback.created_at >= parse_datetime("since", args["since"]))
+    if "until" in allowed and args.get("until"):
+        conditions.append(Feedback.created_at < parse_datetime("until", args["until"]))
+
+    return conditions
@@ -0,0 +1,44 @@
+# ==============================================
+# app/services/http_cache.py
+# ETag / conditional GET support for the read endpoints
+# - @conditional("slides", cache_control="public, max-age=60")
+# - The strong ETag is derived from the endpoint, its query args and the
+#   shared data_versions counters, so a matching If-None-Match is answered
+#   with 304 before the view runs or touches any rows
+# ==============================================
+
+import hashlib
+from functools import wraps
+from flask import request, current_app
+from app.services import versions
+
+
+def compute_etag(tags):
+    """Strong validator for the current request given the data domains it reads."""
+    parts = [request.endpoint or "", repr(sorted(request.args.items(multi=True)))]
+    parts.extend(f"{name}:{version}" for name, version in versions.snapshot(tags))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def conditional(*tags, cache_control="no-cache"):
+    """
+    Add an ETag and Cache-Control header to a GET view and answer
+    If-None-Match revalidations with 304 Not Modified.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(tags)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = cache_control
+            return response
+        return wrapper
+    return decorator
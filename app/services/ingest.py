@@ -0,0 +1,102 @@
+# ==============================================
+# app/services/ingest.py
+# Feedback write path shared by /submit and /bulk
+# - validate_feedback: the submission rules, returns (record, error);
+#   locations are checked against app/services/location_registry.py
+# - save_feedback: multi-row INSERT per chunk + rollup, reason-term and
+#   trend-bucket counter updates, in the caller's transaction (the caller commits)
+#   Location names are stored once in the locations table; rows carry location_id
+#   Committed rows are pushed to /api/dashboard/stream (app/services/live.py)
+# ==============================================
+
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import insert
+from app.database import db
+from app.models import Feedback
+from app.services import live, location_registry, locations, reason_terms, rollups, trends
+from app.services.cache import mark_changed
+
+REQUIRED_FIELDS = ("subcounty", "ward", "village", "age_bracket", "will_vote")
+
+
+def validate_feedback(data):
+    """
+    Validate one submission payload.
+    Returns (record, None) where record holds the Feedback column values,
+    or (None, "error message").
+    """
+    if not isinstance(data, dict):
+        return None, "Each record must be a JSON object"
+
+    # Validate required fields
+    if not all(data.get(field) for field in REQUIRED_FIELDS):
+        return None, "All fields are required"
+
+    if not all(isinstance(data[field], str) for field in locations.LOCATION_KEYS):
+        return None, "subcounty, ward and village must be text"
+    if not all(data[field].strip() for field in locations.LOCATION_KEYS):
+        return None, "All fields are required"
+
+    # Canonical spelling, so "muthara " and "Muthara" land in the same group
+    location, error = location_registry.canonicalize(*(data[field] for field in locations.LOCATION_KEYS))
+    if error:
+        return None, error
+
+    vote_input = data["will_vote"]  # Expecting 'Yes' or 'No'
+    if not isinstance(vote_input, str):
+        return None, "will_vote must be 'Yes' or 'No'"
+
+    reason = data.get("reason", None)
+    if reason is not None and not isinstance(reason, str):
+        return None, "reason must be text"
+
+    record = {field: data[field] for field in REQUIRED_FIELDS}
+    record.update(zip(locations.LOCATION_KEYS, location))
+    # Convert 'Yes'/'No' to Boolean
+    record["will_vote"] = True if vote_input.lower() == "yes" else False
+    record["reason"] = reason
+    return record, None
+
+
+def save_feedback(records, chunk_size=500):
+    """
+    Insert validated records and add them to the rollups, reason-term
+    counters and hourly trend buckets.
+    Each chunk goes to the database as a single multi-row INSERT.
+    Runs in the caller's transaction; nothing is committed here.
+    """
+    # Bump the feedback version before any id is allocated: on Postgres the
+    # upsert locks that row until commit, so feedback ids become visible in
+    # commit order (SQLite serializes writers anyway). /api/feedback/changes
+    # relies on this to page by id without skipping late commits.
+    mark_changed("feedback")
+
+    # Stamp every row here so the trend buckets and the rows agree on the time
+    now = datetime.utcnow()
+    records = [r if r.get("created_at") else dict(r, created_at=now) for r in records]
+
+    keys = [tuple(r[k] for k in locations.LOCATION_KEYS) for r in records]
+    resolved = locations.resolve(keys)
+    # Count under the stored spelling, which may come from another worker
+    records = [dict(r, **dict(zip(locations.LOCATION_KEYS, resolved[key][1]))) for key, r in zip(keys, records)]
+    rows = [
+        {
+            "location_id": resolved[key][0],
+            "age_bracket": r["age_bracket"],
+            "will_vote": r["will_vote"],
+            "reason": r.get("reason"),
+            "created_at": r["created_at"],
+        }
+        for key, r in zip(keys, records)
+    ]
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        db.session.execute(insert(Feedback).values(chunk))
+
+    entries = [SimpleNamespace(**r) for r in records]
+    rollups.apply_feedback(entries)
+    reason_terms.apply_feedback(entries)
+    trends.apply_feedback(entries)
+    live.record_feedback(entries)
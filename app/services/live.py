@@ -0,0 +1,208 @@
+# ==============================================
+# app/services/live.py
+# Live dashboard feed behind GET /api/dashboard/stream (Server-Sent Events)
+# - save_feedback calls record_feedback(); once the transaction commits the
+#   per-location yes/no deltas are published as one "feedback" event
+# - EventBroker: in-process pub/sub with a bounded history, so a client that
+#   reconnects with Last-Event-ID gets exactly the events it missed
+# - event ids are "<broker epoch>-<seq>"; an id from another worker, an
+#   earlier process or beyond the history gets a "snapshot" event instead
+#   (fresh totals, the client refetches its breakdowns)
+# - writes made by other gunicorn workers only show up as a bumped
+#   "feedback" data version; the broker notices and publishes a "resync"
+#   carrying fresh totals
+# Streams hold a worker thread each, so the Procfile runs gthread workers and
+# LIVE_MAX_STREAMS keeps streams to a fraction of GUNICORN_THREADS.
+# ==============================================
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from sqlalchemy import event
+from app.database import db
+from app.services import stats, versions
+
+
+class EventBroker:
+    def __init__(self, history=1000):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=history)  # (seq, name, payload)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.streams = 0
+        self.published = 0
+        # Cross-worker change detection
+        self._local_bumps = 0
+        self._seen_version = None
+        self._checked_at = 0.0
+        self._check_lock = threading.Lock()
+
+    def set_history(self, history):
+        with self._cond:
+            self._events = deque(self._events, maxlen=history)
+
+    def open_stream(self, limit):
+        """Reserve a stream slot; False when limit streams are already open."""
+        with self._cond:
+            if self.streams >= limit:
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self.streams -= 1
+
+    def event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, name, payload):
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, name, json.dumps(payload, separators=(",", ":"))))
+            self.published += 1
+            self._cond.notify_all()
+            return self._seq
+
+    @property
+    def last_seq(self):
+        with self._cond:
+            return self._seq
+
+    def resume_seq(self, last_event_id):
+        """Sequence number to replay from for a Last-Event-ID, or None if it cannot be resumed."""
+        epoch, _, seq = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._cond:
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            if seq > self._seq or seq < oldest - 1:
+                return None
+        return seq
+
+    def wait(self, after_seq, timeout):
+        """Events newer than after_seq, waiting up to timeout seconds for the first one."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq, timeout)
+            return [e for e in self._events if e[0] > after_seq]
+
+    def note_local_bump(self):
+        with self._check_lock:
+            self._local_bumps += 1
+
+    def check_remote_writes(self, interval):
+        """
+        Publish a "resync" when the shared feedback version moved further than
+        this worker's own writes explain. Checked at most every interval
+        seconds per worker, whatever the number of open streams.
+        """
+        now = time.monotonic()
+        with self._check_lock:
+            if now - self._checked_at < interval:
+                return
+            self._checked_at = now
+            local_bumps, self._local_bumps = self._local_bumps, 0
+
+        try:
+            version = dict(versions.snapshot(["feedback"]))["feedback"]
+        finally:
+            db.session.close()  # do not hold a pooled connection while streaming
+
+        with self._check_lock:
+            seen, self._seen_version = self._seen_version, version
+        if seen is not None and version - seen > local_bumps:
+            self.publish("resync", snapshot_payload())
+
+    def stats(self):
+        with self._cond:
+            return {
+                "epoch": self.epoch,
+                "last_event_id": self.event_id(self._seq),
+                "history": len(self._events),
+                "published": self.published,
+                "streams": self.streams,
+            }
+
+
+broker = EventBroker()
+
+
+def record_feedback(entries):
+    """Queue yes/no deltas for the current transaction; published after commit."""
+    deltas = db.session.info.setdefault("live_deltas", Counter())
+    for e in entries:
+        deltas[(e.subcounty, e.ward, e.village, bool(e.will_vote))] += 1
+    db.session.info["live_bumps"] = db.session.info.get("live_bumps", 0) + 1
+
+
+def _payload(deltas):
+    grouped = {}
+    for (subcounty, ward, village, will_vote), count in deltas.items():
+        row = grouped.setdefault((subcounty, ward, village), {
+            "subcounty": subcounty, "ward": ward, "village": village, "yes": 0, "no": 0,
+        })
+        row["yes" if will_vote else "no"] += count
+    rows = list(grouped.values())
+    return {"yes": sum(r["yes"] for r in rows), "no": sum(r["no"] for r in rows), "deltas": rows}
+
+
+def _after_commit(session):
+    deltas = session.info.pop("live_deltas", None)
+    for _ in range(session.info.pop("live_bumps", 0)):
+        broker.note_local_bump()
+    if deltas:
+        broker.publish("feedback", _payload(deltas))
+
+
+def _after_rollback(session):
+    session.info.pop("live_deltas", None)
+    session.info.pop("live_bumps", None)
+
+
+def snapshot_payload():
+    try:
+        overview = stats.overview()
+    finally:
+        db.session.close()
+    return {"total": overview["total_feedback"], "yes": overview["total_yes"], "no": overview["total_no"]}
+
+
+def _message(name, payload, event_id):
+    return f"id: {event_id}\nevent: {name}\ndata: {payload}\n\n"
+
+
+def stream(last_event_id=None, heartbeat=15.0, check_interval=1.0, retry_ms=3000):
+    """
+    Generator of SSE messages. Starts with the missed events when
+    last_event_id can be resumed, otherwise with a "snapshot".
+    The caller reserves and releases the stream slot (open_stream/close_stream).
+    """
+    seq = broker.resume_seq(last_event_id)
+    yield f"retry: {retry_ms}\n\n"
+    if seq is None:
+        seq = broker.last_seq
+        yield _message("snapshot", json.dumps(snapshot_payload(), separators=(",", ":")), broker.event_id(seq))
+
+    quiet_since = time.monotonic()
+    while True:
+        broker.check_remote_writes(check_interval)
+        events = broker.wait(seq, timeout=min(check_interval, heartbeat))
+        for event_seq, name, payload in events:
+            yield _message(name, payload, broker.event_id(event_seq))
+            seq = event_seq
+        if events:
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since >= heartbeat:
+            yield ": heartbeat\n\n"
+            quiet_since = time.monotonic()
+
+
+def init_app(app):
+    broker.set_history(app.config.get("LIVE_EVENT_HISTORY", 1000))
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,222 @@
+# ==============================================
+# app/services/location_registry.py
+# Canonical subcounty -> ward -> village registry
+# - normalize (app/services/locations.py): the comparison key ("  MUTHARA "
+#   and "Muthara" are the same place)
+# - LocationRegistry.canonicalize: validate a submitted location and return
+#   its canonical spelling, one dict lookup per level
+# - loaded once per worker: from LOCATION_REGISTRY_PATH when that file
+#   exists (strict: unknown locations are rejected), otherwise learned from
+#   the locations table (new locations are accepted and added)
+# - merge_variants: fold locations that only differ in spelling into one
+#   (flask merge-location-variants)
+# ==============================================
+
+import json
+import os
+import string
+import threading
+from collections import defaultdict
+from sqlalchemy import select, func, update, delete
+from app.database import db
+from app.models import Feedback, Location
+from app.services import locations, versions
+from app.services.cache import mark_changed
+from app.services.locations import normalize
+
+LEVELS = ("subcounty", "ward", "village")
+
+
+def tidy(name):
+    """Spelling stored for a location seen for the first time."""
+    name = " ".join(name.split())
+    if name.islower() or name.isupper():
+        name = string.capwords(name)
+    return name
+
+
+class LocationRegistry:
+    """Nested dicts keyed by normalized name: {subcounty: (Name, {ward: (Name, {village: Name})})}."""
+
+    def __init__(self):
+        self.strict = False
+        self.source = None
+        self._tree = {}
+        self._version = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _add(self, tree, subcounty, ward, village):
+        sub_name, wards = tree.setdefault(normalize(subcounty), (subcounty, {}))
+        ward_name, villages = wards.setdefault(normalize(ward), (ward, {}))
+        village_name = villages.setdefault(normalize(village), village)
+        return sub_name, ward_name, village_name
+
+    def load(self, path=None):
+        """(Re)build the registry from the hierarchy file, or from the locations table."""
+        tree = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                hierarchy = json.load(f)
+            for subcounty, wards in hierarchy.items():
+                for ward, villages in wards.items():
+                    for village in villages:
+                        self._add(tree, subcounty, ward, village)
+            strict, source = True, path
+        else:
+            rows = db.session.execute(
+                select(Location.subcounty, Location.ward, Location.village).order_by(Location.id)
+            ).all()
+            for row in rows:
+                self._add(tree, *row)
+            strict, source = False, "locations"
+
+        with self._lock:
+            self._tree, self.strict, self.source = tree, strict, source
+            self._version = versions.snapshot(("locations",))
+            self._loaded = True
+
+    def ensure_loaded(self, path=None):
+        """Load on first use, and again after another worker merged locations."""
+        if self._loaded and versions.snapshot(("locations",)) == self._version:
+            return
+        self.load(path)
+        locations.clear_cache()
+
+    def lookup(self, subcounty, ward, village):
+        """Canonical (subcounty, ward, village), or None if the registry does not know it."""
+        with self._lock:
+            entry = self._tree.get(normalize(subcounty))
+            if entry is None:
+                return None
+            ward_entry = entry[1].get(normalize(ward))
+            if ward_entry is None:
+                return None
+            village_name = ward_entry[1].get(normalize(village))
+            if village_name is None:
+                return None
+            return entry[0], ward_entry[0], village_name
+
+    def canonicalize(self, subcounty, ward, village):
+        """
+        Returns ((subcounty, ward, village), None) with the canonical spelling,
+        or (None, "error message") for a location outside a strict registry.
+        """
+        with self._lock:
+            entry = self._tree.get(normalize(subcounty))
+            if self.strict:
+                if entry is None:
+                    return None, f"Unknown subcounty '{subcounty}'"
+                ward_entry = entry[1].get(normalize(ward))
+                if ward_entry is None:
+                    return None, f"Unknown ward '{ward}' in subcounty '{entry[0]}'"
+                village_name = ward_entry[1].get(normalize(village))
+                if village_name is None:
+                    return None, f"Unknown village '{village}' in ward '{ward_entry[0]}'"
+                return (entry[0], ward_entry[0], village_name), None
+
+            return self._add(self._tree, tidy(subcounty), tidy(ward), tidy(village)), None
+
+    def stats(self):
+        with self._lock:
+            wards = [w for _, ws in self._tree.values() for w in ws.values()]
+            return {
+                "source": self.source,
+                "strict": self.strict,
+                "subcounties": len(self._tree),
+                "wards": len(wards),
+                "villages": sum(len(vs) for _, vs in wards),
+            }
+
+
+registry = LocationRegistry()
+
+
+def canonicalize(subcounty, ward, village):
+    """Validate and canonicalize one submitted location (see LocationRegistry.canonicalize)."""
+    from flask import current_app
+    registry.ensure_loaded(current_app.config.get("LOCATION_REGISTRY_PATH"))
+    return registry.canonicalize(subcounty, ward, village)
+
+
+def _names(row):
+    return row.subcounty, row.ward, row.village
+
+
+def _most_used_spellings(rows):
+    """Per level, the (tidied) most used spelling of each normalized name."""
+    usage = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        names = _names(row)
+        for depth in range(len(LEVELS)):
+            key = tuple(normalize(n) for n in names[:depth + 1])
+            usage[key][names[depth]] += row.responses or 0
+    return {key: tidy(max(spellings.items(), key=lambda s: s[1])[0]) for key, spellings in usage.items()}
+
+
+def merge_variants(path=None, dry_run=False):
+    """
+    Rewrite every location to its canonical spelling and point feedback at
+    one location per canonical (subcounty, ward, village), deleting the rest.
+    Canonical spellings come from the registry when a hierarchy file is
+    loaded, otherwise the most used spelling of each name wins.
+    Returns [{"into": (...), "merged": [(...), ...], "responses": n}, ...].
+    The string-keyed rollups, reason terms and trend buckets must be rebuilt
+    afterwards (the CLI command does this).
+    """
+    registry.load(path)
+
+    counts = (
+        select(Feedback.location_id, func.count(Feedback.id).label("responses"))
+        .group_by(Feedback.location_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(Location.id, Location.subcounty, Location.ward, Location.village,
+               func.coalesce(counts.c.responses, 0).label("responses"))
+        .outerjoin(counts, counts.c.location_id == Location.id)
+        .order_by(Location.id)
+    ).all()
+
+    most_used = _most_used_spellings(rows)
+    groups = defaultdict(list)
+    for row in rows:
+        canonical = registry.lookup(*_names(row)) if registry.strict else None
+        if canonical is None:
+            keys = [tuple(normalize(n) for n in _names(row)[:depth + 1]) for depth in range(len(LEVELS))]
+            canonical = tuple(most_used[key] for key in keys)
+        groups[canonical].append(row)
+
+    merges = []
+    for canonical, group in groups.items():
+        spellings = {_names(r): r for r in group}
+        if len(group) == 1 and canonical in spellings:
+            continue
+
+        keep = spellings.get(canonical) or max(group, key=lambda r: (r.responses, -r.id))
+        others = [r for r in group if r.id != keep.id]
+        merges.append({
+            "into": canonical,
+            "merged": [_names(r) for r in group if _names(r) != canonical],
+            "responses": sum(r.responses for r in group if _names(r) != canonical),
+        })
+        if dry_run:
+            continue
+
+        if others:
+            other_ids = [r.id for r in others]
+            db.session.execute(
+                update(Feedback).where(Feedback.location_id.in_(other_ids)).values(location_id=keep.id)
+            )
+            db.session.execute(delete(Location).where(Location.id.in_(other_ids)))
+        if _names(keep) != canonical:
+            db.session.execute(
+                update(Location).where(Location.id == keep.id).values(dict(zip(LEVELS, canonical)))
+            )
+
+    if merges and not dry_run:
+        mark_changed("feedback", "locations")
+        db.session.commit()
+        locations.clear_cache()
+        registry.load(path)
+    return merges
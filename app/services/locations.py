@@ -0,0 +1,157 @@
+# ==============================================
+# app/services/locations.py
+# Location dimension lookups
+# - normalize / name_keys: the comparison key of a location ("  MUTHARA "
+#   and "Muthara" are the same place); locations carries these keys under a
+#   unique constraint, so a spelling variant can never become a second row
+# - resolve: (subcounty, ward, village) -> (locations.id, stored spelling)
+#   for the write path, served from an in-process cache; unknown locations
+#   are created in the caller's transaction, reusing the stored spelling of
+#   an existing subcounty / ward, and bump the "locations" data version so
+#   every worker reloads its registry
+# - location_condition: subcounty / ward / village filters as a condition
+#   on Feedback.location_id
+# Ids only enter the cache once the row that holds them is committed.
+# ==============================================
+
+import threading
+from sqlalchemy import select, event, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import db
+from app.models import Feedback, Location
+from app.services.cache import mark_changed
+
+LOCATION_KEYS = ("subcounty", "ward", "village")
+NAME_KEY_COLUMNS = ("subcounty_key", "ward_key", "village_key")
+
+_resolved = {}  # name_keys(...) -> (id, (subcounty, ward, village))
+_lock = threading.Lock()
+
+
+def normalize(name):
+    """'  Igambang-Ombe ' -> 'igambang ombe' (case, spacing, hyphens and apostrophes folded)."""
+    name = name.replace("-", " ").replace("'", "").replace("’", "")
+    return " ".join(name.split()).casefold()
+
+
+def name_keys(subcounty, ward, village):
+    return normalize(subcounty), normalize(ward), normalize(village)
+
+
+def _key_columns():
+    return tuple_(*(getattr(Location, c) for c in NAME_KEY_COLUMNS))
+
+
+def _lookup(keys):
+    """(id, stored spelling) of the given normalized keys that exist in the database."""
+    found = {}
+    keys = list(keys)
+    for start in range(0, len(keys), 300):
+        chunk = keys[start:start + 300]
+        rows = db.session.execute(
+            select(Location.id, Location.subcounty, Location.ward, Location.village,
+                   *(getattr(Location, c) for c in NAME_KEY_COLUMNS))
+            .where(_key_columns().in_(chunk))
+        ).all()
+        found.update({
+            (r.subcounty_key, r.ward_key, r.village_key): (r.id, (r.subcounty, r.ward, r.village))
+            for r in rows
+        })
+    return found
+
+
+def _stored_spelling(names, key):
+    """Spell a new location like the subcounty / ward already in the table, if any."""
+    subcounty, ward, village = names
+    existing = db.session.execute(
+        select(Location.subcounty).where(Location.subcounty_key == key[0]).order_by(Location.id).limit(1)
+    ).scalar()
+    subcounty = existing or subcounty
+    existing = db.session.execute(
+        select(Location.ward)
+        .where(Location.subcounty_key == key[0], Location.ward_key == key[1])
+        .order_by(Location.id).limit(1)
+    ).scalar()
+    return subcounty, existing or ward, village
+
+
+def _create(new):
+    """new: {normalized key: submitted names}."""
+    rows = [
+        dict(zip(LOCATION_KEYS, _stored_spelling(names, key)), **dict(zip(NAME_KEY_COLUMNS, key)))
+        for key, names in new.items()
+    ]
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        db.session.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        # Another worker may be creating the same location concurrently
+        db.session.execute(dialect_insert(Location).on_conflict_do_nothing(), rows)
+    else:
+        db.session.add_all(Location(**row) for row in rows)
+        db.session.flush()
+    # Other workers learn the new place (and its spelling) on their next registry check
+    mark_changed("locations")
+
+
+def resolve(names):
+    """
+    Map (subcounty, ward, village) tuples to (location id, stored spelling),
+    creating missing locations in the current transaction (the caller
+    commits). Spelling variants of a known location resolve to that location.
+    """
+    by_key = {name_keys(*n): n for n in set(names)}
+    with _lock:
+        resolved = {k: _resolved[k] for k in by_key if k in _resolved}
+    pending = db.session.info.setdefault("new_locations", {})
+    resolved.update({k: pending[k] for k in by_key.keys() - resolved.keys() if k in pending})
+
+    missing = by_key.keys() - resolved.keys()
+    if missing:
+        found = _lookup(missing)
+        with _lock:
+            _resolved.update(found)
+        resolved.update(found)
+
+        created = missing - found.keys()
+        if created:
+            _create({k: by_key[k] for k in created})
+            new = _lookup(created)
+            pending.update(new)
+            resolved.update(new)
+    return {n: resolved[k] for k, n in by_key.items()}
+
+
+def resolve_ids(names):
+    """Like resolve(), but only the ids."""
+    return {n: location_id for n, (location_id, _) in resolve(names).items()}
+
+
+def location_condition(filters):
+    """Condition on Feedback.location_id for any of subcounty / ward / village, or None."""
+    conditions = [getattr(Location, k) == v for k, v in filters.items() if k in LOCATION_KEYS and v]
+    if not conditions:
+        return None
+    return Feedback.location_id.in_(select(Location.id).where(*conditions))
+
+
+def clear_cache():
+    with _lock:
+        _resolved.clear()
+
+
+def _after_commit(session):
+    new = session.info.pop("new_locations", None)
+    if new:
+        with _lock:
+            _resolved.update(new)
+
+
+def _after_rollback(session):
+    session.info.pop("new_locations", None)
+
+
+def init_app(app):
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
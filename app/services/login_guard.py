@@ -0,0 +1,142 @@
+# ==============================================
+# app/services/login_guard.py
+# Admission control for /api/auth/login
+# - TokenBuckets: per-IP and per-username login throttling
+# - VerificationPool: bcrypt runs on a small bounded thread pool instead of
+#   the request thread; when every worker and queue slot is taken the
+#   caller is turned away at once (the route answers 429)
+# - needs_rehash: whether a stored hash uses a different bcrypt cost than
+#   BCRYPT_LOG_ROUNDS, so login can upgrade it transparently
+# ==============================================
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class PoolFull(Exception):
+    """No verification slot is free (or the verification took too long)."""
+
+
+class TokenBuckets:
+    """Token bucket per key; the least recently used keys are forgotten past max_keys."""
+
+    def __init__(self, capacity, per_minute, max_keys=10000):
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spend one token. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                self._buckets.move_to_end(key)
+                return (1 - tokens) / self.rate if self.rate else 60.0
+
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0
+
+
+class VerificationPool:
+    """Bounded thread pool for bcrypt work (the bcrypt C code releases the GIL)."""
+
+    def __init__(self, workers=2, max_queue=16, timeout=5.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for it. Raises PoolFull when saturated."""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PoolFull()
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot stays taken until the work is really done, even if we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.timeouts += 1
+            raise PoolFull()
+        self.completed += 1
+        return result
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+class LoginGuard:
+    def __init__(self, pool, by_ip, by_username, trusted_proxies=0):
+        self.pool = pool
+        self.by_ip = by_ip
+        self.by_username = by_username
+        self.trusted_proxies = trusted_proxies
+
+    def client_ip(self, request):
+        """Client address; with N trusted proxies, the address the outermost one saw."""
+        route = request.access_route
+        if self.trusted_proxies and len(route) >= self.trusted_proxies:
+            return route[-self.trusted_proxies]
+        return request.remote_addr
+
+    def admit(self, request, username):
+        """Charge one attempt to the IP and the username. Returns seconds to wait, or 0."""
+        wait_ip = self.by_ip.take(self.client_ip(request))
+        wait_user = self.by_username.take(username.casefold())
+        return max(wait_ip, wait_user)
+
+
+def hash_rounds(password_hash):
+    """bcrypt cost of a stored hash ('$2b$12$...' -> 12), or None if unreadable."""
+    if isinstance(password_hash, bytes):
+        password_hash = password_hash.decode("utf-8", "replace")
+    parts = (password_hash or "").split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash, rounds):
+    return hash_rounds(password_hash) != rounds
+
+
+def init_app(app):
+    guard = LoginGuard(
+        VerificationPool(
+            workers=app.config.get("LOGIN_VERIFY_WORKERS", 2),
+            max_queue=app.config.get("LOGIN_VERIFY_MAX_QUEUE", 16),
+            timeout=app.config.get("LOGIN_VERIFY_TIMEOUT", 5.0),
+        ),
+        by_ip=TokenBuckets(app.config.get("LOGIN_IP_BURST", 10), app.config.get("LOGIN_IP_PER_MINUTE", 10)),
+        by_username=TokenBuckets(app.config.get("LOGIN_USER_BURST", 5), app.config.get("LOGIN_USER_PER_MINUTE", 5)),
+        trusted_proxies=app.config.get("LOGIN_TRUSTED_PROXIES", 0),
+    )
+    app.extensions["login_guard"] = guard
+    return guard
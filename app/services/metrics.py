@@ -0,0 +1,220 @@
+# ==============================================
+# app/services/metrics.py
+# Request and SQL instrumentation, exposed at /api/metrics
+# - per route (URL rule, so ids do not explode the label set): latency
+#   histogram, responses by status, SQL statements and SQL time
+# - SQL is counted through engine before/after_cursor_execute events and
+#   attributed to the request running on that thread
+# - rendered in the Prometheus text format, together with the connection
+#   pool and response cache counters
+# Counters live in each gunicorn worker; every scrape sees one worker.
+# The endpoint needs an admin JWT, or METRICS_TOKEN as a static bearer token
+# for scrapers that cannot log in.
+# ==============================================
+
+import bisect
+import hmac
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from app.database import db
+from app.services import db_engine
+from app.services.authz import require_role
+from app.services.cache import response_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+POOL_METRICS = (
+    ("db_pool_size", "size", "gauge", "Configured pool size."),
+    ("db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out."),
+    ("db_pool_overflow", "overflow", "gauge", "Connections open beyond pool_size."),
+    ("db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts."),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+    ("db_pool_wait_seconds_total", "wait_seconds_total", "counter", "Time spent waiting for a connection."),
+)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total, result = 0, []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}  # (method, route) -> Histogram
+        self.statements = {}  # (method, route) -> Histogram of statements per request
+        self.responses = defaultdict(int)  # (method, route, status) -> count
+        self.sql_count = defaultdict(int)  # (method, route) -> statements
+        self.sql_seconds = defaultdict(float)  # (method, route) -> seconds
+
+    def observe(self, method, route, status, seconds, sql_count, sql_seconds):
+        key = (method, route)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.statements[key] = Histogram(STATEMENT_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.statements[key].observe(sql_count)
+            self.responses[(method, route, status)] += 1
+            self.sql_count[key] += sql_count
+            self.sql_seconds[key] += sql_seconds
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+request_metrics = RequestMetrics()
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_sql_seconds = 0.0
+
+
+def _after_request(response):
+    started = g.get("metrics_started")
+    if started is not None:
+        request_metrics.observe(
+            request.method,
+            _route(),
+            response.status_code,
+            time.perf_counter() - started,
+            g.metrics_sql_count,
+            g.metrics_sql_seconds,
+        )
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_query_start", None)
+    # Background threads (write-behind flusher, CLI) have no request to charge
+    if started is not None and has_request_context() and "metrics_started" in g:
+        g.metrics_sql_count += 1
+        g.metrics_sql_seconds += time.perf_counter() - started
+
+
+def _labels(**labels):
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _histogram_lines(name, histograms):
+    lines = []
+    for (method, route), histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {count}")
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+    return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with request_metrics._lock:
+        latency = {k: _copy(h) for k, h in request_metrics.latency.items()}
+        statements = {k: _copy(h) for k, h in request_metrics.statements.items()}
+        responses = dict(request_metrics.responses)
+        sql_count = dict(request_metrics.sql_count)
+        sql_seconds = dict(request_metrics.sql_seconds)
+
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+        *_histogram_lines("http_request_duration_seconds", latency),
+        "# HELP http_responses_total Responses by route and status code.",
+        "# TYPE http_responses_total counter",
+        *(
+            f"http_responses_total{_labels(method=m, route=r, status=s)} {n}"
+            for (m, r, s), n in sorted(responses.items())
+        ),
+        "# HELP sql_statements_per_request SQL statements executed per request.",
+        "# TYPE sql_statements_per_request histogram",
+        *_histogram_lines("sql_statements_per_request", statements),
+        "# HELP sql_statements_total SQL statements executed, by route.",
+        "# TYPE sql_statements_total counter",
+        *(f"sql_statements_total{_labels(method=m, route=r)} {n}" for (m, r), n in sorted(sql_count.items())),
+        "# HELP sql_statement_seconds_total Time spent in SQL statements, by route.",
+        "# TYPE sql_statement_seconds_total counter",
+        *(
+            f"sql_statement_seconds_total{_labels(method=m, route=r)} {s:.6f}"
+            for (m, r), s in sorted(sql_seconds.items())
+        ),
+    ]
+
+    pool = db_engine.pool_stats(db.engine)
+    for name, key, kind, help_text in POOL_METRICS:
+        if pool.get(key) is not None:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {pool[key]}"]
+
+    cache = response_cache.stats()
+    for key in ("hits", "misses", "evictions", "invalidations"):
+        name = f"response_cache_{key}_total"
+        lines += [f"# TYPE {name} counter", f"{name} {cache[key]}"]
+
+    return "\n".join(lines) + "\n"
+
+
+def _copy(histogram):
+    clone = Histogram(histogram.bounds)
+    clone.counts, clone.sum, clone.count = list(histogram.counts), histogram.sum, histogram.count
+    return clone
+
+
+def _render_response():
+    return current_app.response_class(render(), mimetype="text/plain; version=0.0.4")
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return _render_response()
+    return require_role("admin", "superadmin")(_render_response)()
+
+
+def init_app(app, engine):
+    """Install the request hooks, the engine listeners and GET /api/metrics."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_url_rule("/api/metrics", "metrics", metrics_view, methods=["GET"])
@@ -0,0 +1,152 @@
+# ==============================================
+# app/services/query_plans.py
+# Query-plan check for the hot dashboard / feedback / slide queries
+# - _hot_queries() mirrors the query shapes used in app/routes, building
+#   them with the services' own statement builders where they have one
+# - check_query_plans() runs EXPLAIN for each one and reports whether
+#   the plan reaches the table through an index (SQLite and Postgres)
+# - filtered queries must look rows up (SQLite SEARCH, Postgres index
+#   condition); walking a whole index counts as a full scan. Only the
+#   whole-table aggregates in FULL_SCANS may scan, and then through an index
+# ==============================================
+
+import json
+from datetime import datetime
+from sqlalchemy import select, func, case, text
+from app.database import db
+from app.models import Admin, Feedback, FeedbackBucket, FeedbackRollup, Location, ReasonTerm, Slideshow
+from app.services import changes, reasons, search, stats
+
+
+# Whole-table aggregates: reading every row is the point, through an index
+FULL_SCANS = frozenset({
+    "stats.overview",
+    "feedback.rollup_rebuild",
+    "rollups.by_subcounty",
+    "rollups.by_ward",
+    "rollups.by_village",
+})
+
+
+def _no_reasons_page(**filters):
+    """The statement app/services/reasons.py runs for a second (cursor) page."""
+    cursor = reasons.encode_cursor(datetime(2030, 1, 1), 2**31 - 1)
+    return reasons.no_reasons_statement(
+        (Location.ward, Location.village, Feedback.reason), dict(filters, cursor=cursor), 100
+    )
+
+
+def _top_terms(*filters):
+    """Top-N shape used by app/services/reason_terms.py."""
+    total = func.sum(ReasonTerm.count)
+    return (
+        select(ReasonTerm.term, total)
+        .where(ReasonTerm.ngram == 1, *filters)
+        .group_by(ReasonTerm.term)
+        .order_by(total.desc(), ReasonTerm.term)
+        .limit(20)
+    )
+
+
+def _hot_queries():
+    """Name -> SELECT statement, one per hot query shape in the routes."""
+    return {
+        "stats.overview": stats.overview_statement(),
+        "feedback.latest": select(func.max(Feedback.created_at)),
+        "feedback.rollup_rebuild": select(
+            Feedback.location_id,
+            Feedback.age_bracket,
+            func.count(Feedback.id),
+            func.sum(case((Feedback.will_vote == True, 1), else_=0)),
+        ).group_by(Feedback.location_id, Feedback.age_bracket),
+        "feedback.no_reasons_page": _no_reasons_page(),
+        "feedback.no_reasons_page_by_ward": _no_reasons_page(ward="Kathwana"),
+        "feedback.no_reasons_page_by_village": _no_reasons_page(village="Kanyuru"),
+        "feedback.changes": changes.rows_statement(190000, [], 501),
+        "feedback.changes_aggregate": changes.aggregate_statement(190000, 195000, []),
+        "locations.by_key": select(Location.id).where(
+            Location.subcounty_key == "igambangombe", Location.ward_key == "kathwana", Location.village_key == "kanyuru"
+        ),
+        "rollups.by_subcounty": select(
+            FeedbackRollup.subcounty, func.sum(FeedbackRollup.total)
+        ).group_by(FeedbackRollup.subcounty),
+        "rollups.by_ward": select(
+            FeedbackRollup.ward, func.sum(FeedbackRollup.total)
+        ).group_by(FeedbackRollup.ward),
+        "rollups.by_village": select(
+            FeedbackRollup.village, func.sum(FeedbackRollup.total)
+        ).group_by(FeedbackRollup.village),
+        "rollups.by_village_in_ward": select(
+            FeedbackRollup.village, func.sum(FeedbackRollup.total)
+        ).where(FeedbackRollup.ward == "Kathwana").group_by(FeedbackRollup.village),
+        "feedback.search": search.search_statement('ID card "polling station"'),
+        "reason_terms.top": _top_terms(),
+        "reason_terms.top_by_ward": _top_terms(ReasonTerm.ward == "Kathwana"),
+        "buckets.trend": select(FeedbackBucket).where(
+            FeedbackBucket.bucket_start >= datetime(2026, 1, 1)
+        ),
+        "slides.active": select(Slideshow).where(Slideshow.is_active == True),
+        "admins.by_username": select(Admin).where(Admin.username == "admin"),
+    }
+
+
+def _explain_sqlite(sql, full_scan):
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    details = [r[-1] for r in rows]
+    # "SEARCH ..." and FTS5 "SCAN feedback_fts VIRTUAL TABLE INDEX ..." are
+    # lookups. "SCAN feedback USING [COVERING] INDEX ..." reads the whole
+    # index, fine only for a full-scan query; a bare "SCAN feedback" never is.
+    scans = [d for d in details if d.startswith("SCAN ") and " VIRTUAL TABLE INDEX " not in d]
+    if full_scan:
+        uses_index = all(" USING " in d for d in scans)
+    else:
+        uses_index = not scans
+    return uses_index, "\n".join(details)
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _explain_postgresql(sql, full_scan):
+    # Turn sequential scans off so the planner reports an index path whenever
+    # one exists, independent of how few rows a staging table holds.
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = list(_plan_nodes(plan[0]["Plan"]))
+    # An index scan without an Index Cond walks the whole index
+    full_index_scans = [
+        n for n in nodes if n["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in n
+    ]
+    uses_index = not any(n["Node Type"] == "Seq Scan" for n in nodes) and (full_scan or not full_index_scans)
+    summary = [
+        f'{n["Node Type"]} {n.get("Index Name") or n.get("Relation Name") or ""}'.strip()
+        for n in nodes
+    ]
+    return uses_index, "\n".join(summary)
+
+
+def check_query_plans():
+    """
+    Explain every hot query on the current database.
+    Returns a list of {"query", "uses_index", "plan"} dicts.
+    """
+    dialect = db.session.get_bind().dialect
+    explain = {"sqlite": _explain_sqlite, "postgresql": _explain_postgresql}.get(dialect.name)
+    if explain is None:
+        raise RuntimeError(f"No query-plan check for the '{dialect.name}' backend")
+
+    results = []
+    try:
+        for name, stmt in _hot_queries().items():
+            sql = stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            uses_index, plan = explain(sql, name in FULL_SCANS)
+            results.append({"query": name, "uses_index": uses_index, "plan": plan})
+    finally:
+        db.session.rollback()
+
+    return results
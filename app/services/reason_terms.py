@@ -0,0 +1,119 @@
+# ==============================================
+# app/services/reason_terms.py
+# Incremental term-frequency counters for "No"-vote reasons
+# - tokenize: lowercase, strip punctuation and stopwords
+# - apply_feedback: count each new reason's terms and bigrams per village
+#   (same transaction as the insert, called from app/services/ingest.py)
+# - top_terms: top-N terms / bigrams for any location scope
+# - rebuild_reason_terms: recount from the raw feedback rows
+# ==============================================
+
+import re
+from collections import Counter
+from sqlalchemy import select, func, delete
+from app.database import db
+from app.models import Feedback, Location, ReasonTerm
+from app.services.cache import mark_changed
+from app.services.counters import increment_counters
+
+LOCATION_KEYS = ("subcounty", "ward", "village")
+MAX_TERM_LENGTH = 100
+
+_WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for
+from further had has have having he her here hers herself him himself his how i if in
+into is it its itself just let me more most my myself no nor not of off on once only or
+other our ours ourselves out over own same she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your
+yours yourself yourselves also im ive dont didnt doesnt cant wont isnt arent wasnt
+na ya wa kwa ni za la katika cha vya hii hiyo huo kuwa
+""".split())
+
+
+def tokenize(text):
+    """'No ID card, polling station too far!' -> ['id', 'card', 'polling', 'station', 'far']"""
+    tokens = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        word = word.replace("'", "")
+        if len(word) < 2 or word.isdigit() or word in STOPWORDS:
+            continue
+        tokens.append(word[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def reason_ngrams(text):
+    """Distinct terms and adjacent-term bigrams of one reason: ({terms}, {bigrams})."""
+    tokens = tokenize(text)
+    bigrams = {f"{a} {b}"[:MAX_TERM_LENGTH] for a, b in zip(tokens, tokens[1:])}
+    return set(tokens), bigrams
+
+
+def _term_deltas(entries):
+    counts = Counter()
+    for entry in entries:
+        if entry.will_vote or not entry.reason:
+            continue
+        location = tuple(getattr(entry, k) for k in LOCATION_KEYS)
+        terms, bigrams = reason_ngrams(entry.reason)
+        for term in terms:
+            counts[location + (1, term)] += 1
+        for term in bigrams:
+            counts[location + (2, term)] += 1
+
+    return [
+        dict(zip(LOCATION_KEYS + ("ngram", "term"), key), count=count)
+        for key, count in counts.items()
+    ]
+
+
+def apply_feedback(entries):
+    """Add the terms of new "No" reasons to the per-village counters (caller's transaction)."""
+    increment_counters(
+        ReasonTerm, LOCATION_KEYS + ("ngram", "term"), ("count",), _term_deltas(entries)
+    )
+
+
+def top_terms(filters=None, limit=20):
+    """
+    Most frequent terms and bigrams within a location scope:
+    {"terms": [{"term": "id", "count": 40}, ...], "bigrams": [{"term": "id card", "count": 31}, ...]}
+    filters: any of subcounty / ward / village.
+    """
+    conditions = [getattr(ReasonTerm, k) == v for k, v in (filters or {}).items() if k in LOCATION_KEYS]
+
+    data = {}
+    for ngram, key in ((1, "terms"), (2, "bigrams")):
+        total = func.sum(ReasonTerm.count).label("count")
+        rows = db.session.execute(
+            select(ReasonTerm.term, total)
+            .where(ReasonTerm.ngram == ngram, *conditions)
+            .group_by(ReasonTerm.term)
+            .order_by(total.desc(), ReasonTerm.term)
+            .limit(limit)
+        ).all()
+        data[key] = [{"term": r.term, "count": int(r.count)} for r in rows]
+    return data
+
+
+def rebuild_reason_terms(batch_size=5000):
+    """Recount every "No" reason from the feedback table. Returns the reasons processed."""
+    db.session.execute(delete(ReasonTerm))
+
+    stmt = (
+        select(Location.subcounty, Location.ward, Location.village, Feedback.will_vote, Feedback.reason)
+        .join_from(Feedback, Location)
+        .where(Feedback.will_vote == False, Feedback.reason.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    processed = 0
+    for partition in db.session.execute(stmt).partitions():
+        apply_feedback(partition)
+        processed += len(partition)
+
+    mark_changed("feedback")
+    db.session.commit()
+    return processed
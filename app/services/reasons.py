@@ -0,0 +1,80 @@
+# ==============================================
+# app/services/reasons.py
+# Keyset pagination over "No"-vote reasons
+# Pages are ordered newest first on (created_at, id) and continue from an
+# opaque cursor, so every page costs the same no matter how deep it is.
+# ==============================================
+
+import base64
+from datetime import datetime
+from sqlalchemy import select, func, tuple_
+from app.database import db
+from app.models import Feedback, Location
+from app.services.feedback_filters import feedback_conditions
+
+
+def encode_cursor(created_at, id):
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_limit(raw, default, maximum):
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, maximum)
+
+
+def no_reasons_statement(columns, args, limit):
+    """
+    SELECT for one page of non-empty reasons from "No" votes, newest first
+    (limit + 1 rows, so the caller can tell whether another page follows).
+    columns: Feedback / Location columns to select (created_at and id are added for the cursor).
+    args: request args; honours cursor plus the subcounty/ward/village filters.
+    """
+    conditions = [
+        Feedback.will_vote == False,
+        Feedback.reason.isnot(None),
+        func.trim(Feedback.reason) != "",
+        *feedback_conditions(args, allowed=("subcounty", "ward", "village")),
+    ]
+    if args.get("cursor"):
+        created_at, id = decode_cursor(args["cursor"])
+        conditions.append(tuple_(Feedback.created_at, Feedback.id) < tuple_(created_at, id))
+
+    return (
+        select(*columns, Feedback.created_at, Feedback.id)
+        .join_from(Feedback, Location)
+        .where(*conditions)
+        .order_by(Feedback.created_at.desc(), Feedback.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def page_no_reasons(columns, args, limit):
+    """
+    One page of non-empty reasons from "No" votes, newest first
+    (see no_reasons_statement for columns and args).
+    Returns (rows, next_cursor) where next_cursor is None on the last page.
+    """
+    rows = db.session.execute(no_reasons_statement(columns, args, limit)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,80 @@
+# ==============================================
+# app/services/rollups.py
+# Incrementally maintained feedback counters
+# - apply_feedback: add new responses to the rollups (same transaction)
+# - rebuild_rollups: recompute every rollup from the raw feedback rows
+# ==============================================
+
+from sqlalchemy import func, case, insert, select, delete
+from app.database import db
+from app.models import Feedback, FeedbackRollup, Location
+from app.services.cache import mark_changed
+from app.services.counters import increment_counters
+
+ROLLUP_KEYS = ("subcounty", "ward", "village", "age_bracket")
+
+
+def _group_deltas(entries):
+    """Collapse a batch of feedback entries into per-group counter deltas."""
+    deltas = {}
+    for entry in entries:
+        key = tuple(getattr(entry, k) for k in ROLLUP_KEYS)
+        total, yes, no = deltas.get(key, (0, 0, 0))
+        if entry.will_vote:
+            deltas[key] = (total + 1, yes + 1, no)
+        else:
+            deltas[key] = (total + 1, yes, no + 1)
+
+    return [
+        dict(zip(ROLLUP_KEYS, key), total=total, yes_count=yes, no_count=no)
+        for key, (total, yes, no) in deltas.items()
+    ]
+
+
+def apply_feedback(entries):
+    """
+    Add new feedback entries to the rollup counters.
+    Runs inside the caller's session, so the counters are committed (or
+    rolled back) together with the feedback rows themselves.
+    Entries may be Feedback instances or any objects/namespaces exposing the
+    same attributes.
+    """
+    increment_counters(
+        FeedbackRollup, ROLLUP_KEYS, ("total", "yes_count", "no_count"), _group_deltas(entries)
+    )
+
+
+def rebuild_rollups():
+    """Recompute all rollups from the raw feedback table. Returns the group count."""
+    # Count per location id first (index-only), then attach the names
+    counts = (
+        select(
+            Feedback.location_id,
+            Feedback.age_bracket,
+            func.count(Feedback.id).label("total"),
+            func.sum(case((Feedback.will_vote == True, 1), else_=0)).label("yes_count"),
+            func.sum(case((Feedback.will_vote == False, 1), else_=0)).label("no_count"),
+        )
+        .group_by(Feedback.location_id, Feedback.age_bracket)
+        .subquery()
+    )
+    grouped = select(
+        Location.subcounty,
+        Location.ward,
+        Location.village,
+        counts.c.age_bracket,
+        counts.c.total,
+        counts.c.yes_count,
+        counts.c.no_count,
+    ).join(counts, counts.c.location_id == Location.id)
+
+    db.session.execute(delete(FeedbackRollup))
+    db.session.execute(
+        insert(FeedbackRollup).from_select(
+            [*ROLLUP_KEYS, "total", "yes_count", "no_count"], grouped
+        )
+    )
+    mark_changed("feedback")
+    db.session.commit()
+    return db.session.query(func.count()).select_from(FeedbackRollup).scalar()
+
@@ -0,0 +1,113 @@
+# ==============================================
+# app/services/search.py
+# Ranked full-text search over Feedback.reason
+# - SQLite: FTS5 table feedback_fts (bm25 ranking), synced by triggers
+# - Postgres: generated reason_tsv column + GIN index (ts_rank ranking)
+# Both are created by the "reason full text index" migration.
+# Queries support "quoted phrases"; other words must all match.
+# ==============================================
+
+import re
+from sqlalchemy import select, func, literal_column, table, column
+from app.database import db
+from app.models import Feedback, Location
+
+RESULT_COLUMNS = (
+    Feedback.id,
+    Location.subcounty,
+    Location.ward,
+    Location.village,
+    Feedback.will_vote,
+    Feedback.reason,
+    Feedback.created_at,
+)
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+feedback_fts = table("feedback_fts", column("rowid"), column("reason"))
+
+
+def parse_query(q):
+    """Split a user query into phrases: 'ID card "polling station"' -> ['ID', 'card', 'polling station']."""
+    terms = []
+    for phrase, word in _TERM_RE.findall(q or ""):
+        term = " ".join((phrase or word).split())
+        if term:
+            terms.append(term)
+    return terms
+
+
+def _fts5_match(terms):
+    # Quote every term so user input can never be read as FTS5 syntax
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def _statement_sqlite(terms, conditions, limit):
+    rank = func.bm25(literal_column("feedback_fts"))
+    return (
+        select(*RESULT_COLUMNS, (-rank).label("rank"))
+        .select_from(
+            feedback_fts.join(Feedback, Feedback.id == feedback_fts.c.rowid)
+            .join(Location, Location.id == Feedback.location_id)
+        )
+        .where(literal_column("feedback_fts").op("MATCH")(_fts5_match(terms)), *conditions)
+        .order_by(rank)
+        .limit(limit)
+    )
+
+
+def _statement_postgresql(terms, conditions, limit):
+    tsv = literal_column("feedback.reason_tsv")
+    websearch = " ".join(f'"{t}"' if " " in t else t for t in terms)
+    query = func.websearch_to_tsquery("english", websearch)
+    rank = func.ts_rank(tsv, query)
+    return (
+        select(*RESULT_COLUMNS, rank.label("rank"))
+        .join_from(Feedback, Location)
+        .where(tsv.op("@@")(query), *conditions)
+        .order_by(rank.desc(), Feedback.id.desc())
+        .limit(limit)
+    )
+
+
+def _statement_fallback(terms, conditions, limit):
+    return (
+        select(*RESULT_COLUMNS, literal_column("0").label("rank"))
+        .join_from(Feedback, Location)
+        .where(*(Feedback.reason.ilike(f"%{t}%") for t in terms), *conditions)
+        .order_by(Feedback.id.desc())
+        .limit(limit)
+    )
+
+
+def search_statement(q, conditions=(), limit=20):
+    """SELECT for the ranked matches of q on the current backend."""
+    terms = parse_query(q)
+    if not terms:
+        raise ValueError("A search query is required")
+
+    build = {"sqlite": _statement_sqlite, "postgresql": _statement_postgresql}.get(
+        db.session.get_bind().dialect.name, _statement_fallback
+    )
+    return build(terms, conditions, limit)
+
+
+def search_reasons(q, conditions=(), limit=20):
+    """
+    Ranked matches for q among feedback reasons, best first.
+    conditions: extra SQLAlchemy filters on Feedback (location, vote).
+    """
+    rows = db.session.execute(search_statement(q, conditions, limit)).all()
+    return [
+        {
+            "id": r.id,
+            "subcounty": r.subcounty,
+            "ward": r.ward,
+            "village": r.village,
+            "will_vote": r.will_vote,
+            "reason": r.reason,
+            "created_at": r.created_at.isoformat() if r.created_at else None,
+            "rank": round(float(r.rank or 0), 4),
+        }
+        for r in rows
+    ]
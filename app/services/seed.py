@@ -0,0 +1,211 @@
+# ==============================================
+# app/services/seed.py
+# Synthetic data for load tests (flask seed)
+# - locations: the registry hierarchy when one is configured, otherwise a
+#   generated subcounty -> ward -> village tree
+# - feedback: Zipf-skewed locations, weighted age brackets, a yes ratio and
+#   reason texts, sampled a batch at a time with random.choices and written
+#   with one executemany INSERT per batch
+# - on SQLite the feedback indexes and FTS trigger are dropped for the load,
+#   the indexes rebuilt once at the end and only the new rows added to the
+#   search index (much faster than maintaining them row by row); drop, load
+#   and rebuild are one transaction, so an error, Ctrl-C or a killed process
+#   rolls back to the original rows with every index in place
+# - SQLite formats created_at itself from epoch microseconds
+# The caller (flask seed) rebuilds the rollups, reason terms and trend
+# buckets once the rows are in.
+# ==============================================
+
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import insert, select, text
+from app.database import db
+from app.models import Admin, Feedback, Slideshow
+from app.services import locations
+from app.services.cache import mark_changed
+
+AGE_BRACKETS = ("18-28", "29-40", "41-55", "56+")
+DEFAULT_AGE_WEIGHTS = (35, 30, 22, 13)
+
+REASONS = (
+    "No ID card yet", "I lost my ID card", "Polling station is too far",
+    "Polling station too far from the village", "I don't trust the process",
+    "Will be away for work", "Working in Nairobi during elections",
+    "None of the candidates speak for us", "Long queues last time",
+    "My name was missing from the register", "Not registered as a voter",
+    "Not interested in politics", "Roads are bad, no transport",
+    "Promises were not kept last time", "No water projects in our ward",
+    "Youth unemployment is ignored", "Fear of violence", "Too old to walk there",
+    "Bursaries never reach us", "Nobody has visited our village",
+)
+REASON_SUFFIXES = (
+    "", "", "", " honestly", " this year", " again", ", nothing has changed",
+    ", we need jobs", ", fix the roads first", " - same as 2022",
+)
+
+
+def synthetic_locations(subcounties=4, wards=5, villages=8):
+    return [
+        (f"Subcounty {s}", f"Ward {s}.{w}", f"Village {s}.{w}.{v}")
+        for s in range(1, subcounties + 1)
+        for w in range(1, wards + 1)
+        for v in range(1, villages + 1)
+    ]
+
+
+def registry_locations(path):
+    """Every (subcounty, ward, village) in a LOCATION_REGISTRY_PATH file, or None."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        hierarchy = json.load(f)
+    return [
+        (subcounty, ward, village)
+        for subcounty, wards in hierarchy.items()
+        for ward, villages in wards.items()
+        for village in villages
+    ]
+
+
+# created_at arrives as microseconds since the epoch and SQLite writes it in
+# SQLAlchemy's "YYYY-MM-DD HH:MM:SS.ffffff" format: far cheaper than a
+# datetime and strftime per row in Python
+_SQLITE_INSERT = (
+    "INSERT INTO feedback (location_id, age_bracket, will_vote, reason, created_at) "
+    "VALUES (?1, ?2, ?3, ?4, strftime('%Y-%m-%d %H:%M:%S', ?5 / 1000000, 'unixepoch') "
+    "|| printf('.%06d', ?5 % 1000000))"
+)
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _SqliteBulkLoad:
+    """
+    Drop the feedback indexes and triggers for the load and recreate them
+    afterwards, all in one transaction (SQLite DDL is transactional): if the
+    load does not finish, the rollback brings the indexes back with it.
+    """
+
+    def __enter__(self):
+        db.session.rollback()
+        # pysqlite only opens a transaction before DML; open it for the DROPs too
+        db.session.connection().exec_driver_sql("BEGIN")
+        self.last_id = db.session.execute(text("SELECT coalesce(max(id), 0) FROM feedback")).scalar()
+        self.saved = db.session.execute(text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE tbl_name = 'feedback' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+        )).all()
+        for kind, name, _ in self.saved:
+            db.session.execute(text(f'DROP {kind.upper()} "{name}"'))
+        return True  # single transaction: the load must not commit
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            db.session.rollback()
+            return False
+        try:
+            for _, _, sql in self.saved:
+                db.session.execute(text(sql))
+            if any(name.startswith("feedback_fts") for _, name, _ in self.saved):
+                # What the insert trigger would have done, for the new rows only
+                db.session.execute(text(
+                    "INSERT INTO feedback_fts(rowid, reason) "
+                    "SELECT id, reason FROM feedback WHERE id > :last_id AND reason IS NOT NULL"
+                ), {"last_id": self.last_id})
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+        return False
+
+
+def seed_feedback(count, rng, location_keys, yes_ratio=0.6, reason_ratio=0.7, skew=1.1,
+                  age_weights=DEFAULT_AGE_WEIGHTS, days=60, batch_size=100000, progress=None,
+                  commit_batches=True):
+    """
+    Insert count synthetic responses spread over the last `days` days
+    (created_at grows with id, like real traffic). Returns the insert
+    rate in rows per second. With commit_batches=False nothing is
+    committed (inside bulk_load() on SQLite).
+    """
+    ids = locations.resolve_ids(location_keys)
+    if commit_batches:
+        db.session.commit()
+
+    # Zipf-like popularity, randomly assigned to locations
+    location_ids = [ids[key] for key in location_keys]
+    rng.shuffle(location_ids)
+    location_cum = list(accumulate(1.0 / (rank ** skew) for rank in range(1, len(location_ids) + 1)))
+    age_cum = list(accumulate(age_weights))
+    reason_texts = [r + s for r in REASONS for s in REASON_SUFFIXES]
+
+    span = days * 86400 * 1000000  # microseconds
+    step = span / count
+    start = datetime.utcnow() - timedelta(days=days)
+    sqlite = db.session.get_bind().dialect.name == "sqlite"
+    start_micros = (start - _EPOCH) // timedelta(microseconds=1)
+    columns = ("location_id", "age_bracket", "will_vote", "reason", "created_at")
+
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        n = min(batch_size, count - offset)
+        location_col = rng.choices(location_ids, cum_weights=location_cum, k=n)
+        age_col = rng.choices(AGE_BRACKETS, cum_weights=age_cum, k=n)
+        vote_col = [rng.random() < yes_ratio for _ in range(n)]
+        reason_col = [
+            None if vote or rng.random() >= reason_ratio else reason
+            for vote, reason in zip(vote_col, rng.choices(reason_texts, k=n))
+        ]
+        offsets = [int((offset + i + rng.random()) * step) for i in range(n)]
+
+        mark_changed("feedback")  # ids in commit order, as in ingest.save_feedback
+        if sqlite:
+            time_col = [start_micros + o for o in offsets]
+            db.session.connection().exec_driver_sql(
+                _SQLITE_INSERT, list(zip(location_col, age_col, vote_col, reason_col, time_col))
+            )
+        else:
+            time_col = [start + timedelta(microseconds=o) for o in offsets]
+            db.session.execute(insert(Feedback.__table__), [
+                dict(zip(columns, row)) for row in zip(location_col, age_col, vote_col, reason_col, time_col)
+            ])
+        if commit_batches:
+            db.session.commit()
+        if progress:
+            progress(offset + n)
+
+    elapsed = time.perf_counter() - started
+    return count / elapsed if elapsed else None
+
+
+def seed_slides(count, rng):
+    """Insert count slides (about two thirds active), credited to the first superadmin."""
+    uploader = db.session.execute(
+        select(Admin.id).where(Admin.role == "superadmin").order_by(Admin.id).limit(1)
+    ).scalar()
+    now = datetime.utcnow()
+    db.session.execute(insert(Slideshow.__table__), [
+        {
+            "image_url": f"https://picsum.photos/seed/{rng.randrange(10**9)}/1600/900",
+            "caption": f"Campaign event {i + 1}",
+            "uploaded_by": uploader,
+            "uploaded_at": now - timedelta(days=rng.randrange(90)),
+            "is_active": rng.random() < 0.66,
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def bulk_load():
+    """
+    Context manager for a large feedback load (index rebuild on SQLite, no-op
+    elsewhere). Its value says whether the load runs as a single transaction,
+    i.e. what to pass as seed_feedback(commit_batches=not ...).
+    """
+    if db.session.get_bind().dialect.name == "sqlite":
+        return _SqliteBulkLoad()
+    return nullcontext(False)
@@ -0,0 +1,44 @@
+# ==============================================
+# app/services/stats.py
+# Landing-dashboard statistics in a single round trip
+# - overview_statement: one SELECT returning every headline number
+# - overview: executes it and returns a plain dict
+# ==============================================
+
+from sqlalchemy import select, func, distinct
+from app.database import db
+from app.models import Admin, Feedback, FeedbackRollup
+
+
+def overview_statement():
+    """
+    SELECT total, yes, no and distinct subcounties from the rollups, plus the
+    latest submission time and admin count as scalar subqueries.
+    """
+    latest = select(func.max(Feedback.created_at)).scalar_subquery()
+    admins = select(func.count(Admin.id)).scalar_subquery()
+
+    return select(
+        func.coalesce(func.sum(FeedbackRollup.total), 0).label("total_feedback"),
+        func.coalesce(func.sum(FeedbackRollup.yes_count), 0).label("total_yes"),
+        func.coalesce(func.sum(FeedbackRollup.no_count), 0).label("total_no"),
+        func.count(distinct(FeedbackRollup.subcounty)).label("total_subcounties"),
+        latest.label("latest_feedback"),
+        admins.label("total_admins"),
+    )
+
+
+def overview():
+    """
+    {"total_feedback", "total_yes", "total_no", "total_subcounties",
+     "latest_feedback" (datetime or None), "total_admins"}
+    """
+    row = db.session.execute(overview_statement()).one()
+    return {
+        "total_feedback": int(row.total_feedback),
+        "total_yes": int(row.total_yes),
+        "total_no": int(row.total_no),
+        "total_subcounties": int(row.total_subcounties),
+        "latest_feedback": row.latest_feedback,
+        "total_admins": int(row.total_admins),
+    }
@@ -0,0 +1,156 @@
+# ==============================================
+# app/services/trends.py
+# Time-bucketed yes/no counts for the trend endpoint
+# - apply_feedback: bump the hourly bucket of each new response
+#   (same transaction as the insert, called from app/services/ingest.py)
+# - compact_buckets: fold hourly buckets older than the retention window
+#   into daily buckets
+# - trend: hour / day / week series, optionally per subcounty, read only
+#   from the bucket table
+# - rebuild_buckets: recompute the buckets from the raw feedback rows
+# ==============================================
+
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from app.database import db
+from app.models import Feedback, FeedbackBucket, Location
+from app.services.cache import mark_changed
+from app.services.counters import increment_counters
+
+BUCKET_KEYS = ("granularity", "bucket_start", "subcounty")
+INTERVALS = ("hour", "day", "week")
+
+
+def truncate(moment, interval):
+    """Start of the hour / day / ISO week (Monday) containing moment."""
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _bucket_rows(granularity, counts):
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket_start,
+            "subcounty": subcounty,
+            "yes_count": yes,
+            "no_count": no,
+        }
+        for (bucket_start, subcounty), (yes, no) in counts.items()
+    ]
+
+
+def _hourly_deltas(entries):
+    counts = {}
+    for entry in entries:
+        key = (truncate(entry.created_at or datetime.utcnow(), "hour"), entry.subcounty)
+        yes, no = counts.get(key, (0, 0))
+        counts[key] = (yes + 1, no) if entry.will_vote else (yes, no + 1)
+    return _bucket_rows("hour", counts)
+
+
+def apply_feedback(entries):
+    """Add new responses to their hourly buckets (caller's transaction)."""
+    increment_counters(FeedbackBucket, BUCKET_KEYS, ("yes_count", "no_count"), _hourly_deltas(entries))
+
+
+def compact_buckets(keep_hours_since):
+    """
+    Fold hourly buckets that start before the day containing keep_hours_since
+    into daily buckets. Returns the number of hourly buckets compacted.
+    """
+    cutoff = truncate(keep_hours_since, "day")
+    hourly = db.session.execute(
+        select(FeedbackBucket.bucket_start, FeedbackBucket.subcounty,
+               FeedbackBucket.yes_count, FeedbackBucket.no_count)
+        .where(FeedbackBucket.granularity == "hour", FeedbackBucket.bucket_start < cutoff)
+    ).all()
+    if not hourly:
+        return 0
+
+    daily = {}
+    for row in hourly:
+        key = (truncate(row.bucket_start, "day"), row.subcounty)
+        yes, no = daily.get(key, (0, 0))
+        daily[key] = (yes + row.yes_count, no + row.no_count)
+
+    increment_counters(FeedbackBucket, BUCKET_KEYS, ("yes_count", "no_count"), _bucket_rows("day", daily))
+    db.session.execute(
+        delete(FeedbackBucket).where(
+            FeedbackBucket.granularity == "hour", FeedbackBucket.bucket_start < cutoff
+        )
+    )
+    mark_changed("feedback")
+    db.session.commit()
+    return len(hourly)
+
+
+def trend(interval="day", subcounty=None, by_subcounty=False, since=None, until=None):
+    """
+    Yes/no counts per bucket, oldest first:
+    [{"bucket": "2026-10-12T00:00:00", "yes_count": 40, "no_count": 12, "total": 52}, ...]
+    With by_subcounty every point also carries "subcounty".
+    Hourly points are only available until they are compacted; older data
+    appears once per day.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+
+    conditions = []
+    if subcounty:
+        conditions.append(FeedbackBucket.subcounty == subcounty)
+    if since:
+        conditions.append(FeedbackBucket.bucket_start >= truncate(since, "day" if interval != "hour" else "hour"))
+    if until:
+        conditions.append(FeedbackBucket.bucket_start < until)
+
+    rows = db.session.execute(
+        select(FeedbackBucket.bucket_start, FeedbackBucket.subcounty,
+               FeedbackBucket.yes_count, FeedbackBucket.no_count)
+        .where(*conditions)
+    ).all()
+
+    yes_counts, no_counts = Counter(), Counter()
+    for row in rows:
+        key = (truncate(row.bucket_start, interval), row.subcounty if by_subcounty else None)
+        yes_counts[key] += row.yes_count
+        no_counts[key] += row.no_count
+
+    points = []
+    for key in sorted(yes_counts.keys() | no_counts.keys(), key=lambda k: (k[0], k[1] or "")):
+        point = {"bucket": key[0].isoformat()}
+        if by_subcounty:
+            point["subcounty"] = key[1]
+        point.update(
+            yes_count=yes_counts[key],
+            no_count=no_counts[key],
+            total=yes_counts[key] + no_counts[key],
+        )
+        points.append(point)
+    return points
+
+
+def rebuild_buckets(keep_hours_since, batch_size=5000):
+    """Recompute every bucket from the feedback table, then compact. Returns rows read."""
+    db.session.execute(delete(FeedbackBucket))
+
+    stmt = (
+        select(Feedback.created_at, Location.subcounty, Feedback.will_vote)
+        .join_from(Feedback, Location)
+        .where(Feedback.created_at.isnot(None))
+        .execution_options(yield_per=batch_size)
+    )
+    processed = 0
+    for partition in db.session.execute(stmt).partitions():
+        apply_feedback(partition)
+        processed += len(partition)
+
+    mark_changed("feedback")
+    db.session.commit()
+    compact_buckets(keep_hours_since)
+    return processed
@@ -0,0 +1,73 @@
+# ==============================================
+# app/services/versions.py
+# Shared data-version counters (data_versions table)
+# - bump: increment domain counters inside the writer's transaction
+# - snapshot: current versions for a set of domains, re-read from the
+#   database at most every DATA_VERSION_CHECK_INTERVAL seconds per worker
+# ==============================================
+
+import threading
+import time
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import db
+from app.models import DataVersion
+
+_lock = threading.Lock()
+_versions = {}
+_checked_at = 0.0
+check_interval = 1.0  # seconds; 0 re-reads on every snapshot()
+
+
+def bump(*names):
+    """Increment the counters for these domains in the current transaction."""
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(
+        db.session.get_bind().dialect.name
+    )
+    for name in sorted(set(names)):
+        if dialect_insert is not None:
+            stmt = dialect_insert(DataVersion).values(name=name, version=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["name"], set_={"version": DataVersion.version + 1}
+            )
+            db.session.execute(stmt)
+            continue
+
+        updated = db.session.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.add(DataVersion(name=name, version=1))
+
+
+def expire():
+    """Force the next snapshot() to re-read the counters (after a local write)."""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
+
+
+def _refresh():
+    global _versions, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _checked_at and now - _checked_at < check_interval:
+            return _versions
+
+    rows = db.session.execute(select(DataVersion.name, DataVersion.version)).all()
+
+    with _lock:
+        _versions = {name: version for name, version in rows}
+        _checked_at = now
+        return _versions
+
+
+def snapshot(names):
+    """Tuple of (name, version) pairs for the given domains, in a stable order."""
+    versions = _refresh()
+    return tuple((name, versions.get(name, 0)) for name in sorted(set(names)))
+
+
+def init_app(app):
+    global check_interval
+    check_interval = app.config.get("DATA_VERSION_CHECK_INTERVAL", 1.0)
@@ -0,0 +1,163 @@
+# ==============================================
+# app/services/write_behind.py
+# Optional write-behind mode for /api/feedback/submit
+# - Validated submissions go into a bounded in-memory queue (202 Accepted)
+# - A background thread writes them in batches when FEEDBACK_BUFFER_BATCH_SIZE
+#   records are waiting or FEEDBACK_BUFFER_FLUSH_INTERVAL seconds have passed
+# - offer() returns False when the queue is full so the route can push back
+# - rows are stamped (created_at) when they are written, not when queued
+# - a batch that keeps failing (FEEDBACK_BUFFER_MAX_ATTEMPTS) is retried row
+#   by row; rows that still fail are logged and dropped so one bad record
+#   cannot block everything queued behind it
+# - the flusher thread starts with the first offer(), so CLI runs
+#   (flask db upgrade, flask seed, ...) never start one
+# - Whatever is still queued is flushed when the worker shuts down
+# ==============================================
+
+import atexit
+import queue
+import threading
+import time
+from app.database import db
+from app.services import ingest
+
+
+class FeedbackBuffer:
+    def __init__(self, app, max_size=10000, batch_size=500, flush_interval=0.5, max_attempts=3):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pending = []  # batch that failed to write, retried first
+        self._attempts = 0  # failed writes of the pending batch
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the flusher thread (once)."""
+        with self._start_lock:
+            if self._thread is not None or self._stop.is_set():
+                return
+            self._thread = threading.Thread(target=self._run, name="feedback-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def offer(self, record):
+        """Queue a validated record. Returns False if the buffer is full."""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def _take_batch(self):
+        batch, self._pending = self._pending, []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        batch, self._pending = self._pending, []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, batch):
+        with self.app.app_context():
+            try:
+                ingest.save_feedback(batch, chunk_size=self.batch_size)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self.failures += 1
+                self.app.logger.exception("Write-behind flush of %d feedback records failed", len(batch))
+                return False
+            finally:
+                db.session.remove()
+
+        self.flushed += len(batch)
+        self.batches += 1
+        return True
+
+    def _write_rows(self, batch):
+        """Write a failing batch one record at a time, dropping the records that still fail."""
+        for record in batch:
+            if not self._write([record]):
+                self.dropped += 1
+                self.app.logger.error("Dropped write-behind feedback record: %r", record)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if not batch or self._write(batch):
+                self._attempts = 0
+                continue
+            self._attempts += 1
+            if self._attempts >= self.max_attempts:
+                self._attempts = 0
+                self._write_rows(batch)
+            else:
+                self._pending = batch
+                self._stop.wait(self.flush_interval)  # back off before retrying
+
+    def stop(self):
+        """Stop the flusher and write everything still queued."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        batch = self._drain()
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            if not self._write(chunk):
+                self._write_rows(chunk)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() + len(self._pending),
+            "capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+def init_app(app):
+    """Set up the buffer when FEEDBACK_WRITE_BEHIND is enabled; it starts on the first offer()."""
+    if not app.config.get("FEEDBACK_WRITE_BEHIND", False):
+        return None
+
+    buffer = FeedbackBuffer(
+        app,
+        max_size=app.config.get("FEEDBACK_BUFFER_MAX_SIZE", 10000),
+        batch_size=app.config.get("FEEDBACK_BUFFER_BATCH_SIZE", 500),
+        flush_interval=app.config.get("FEEDBACK_BUFFER_FLUSH_INTERVAL", 0.5),
+        max_attempts=app.config.get("FEEDBACK_BUFFER_MAX_ATTEMPTS", 3),
+    )
+    app.extensions["feedback_buffer"] = buffer
+    return buffer
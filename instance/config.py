@@ -12,6 +12,84 @@ SQLALCHEMY_DATABASE_URI = os.environ.get(
     "DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'portfolio.db')}"
 )
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# Engine tuning (app/services/db_engine.py); pool size is per gunicorn worker
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 10))  # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # seconds (Postgres)
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"  # Postgres
+DB_STATEMENT_TIMEOUT = int(os.environ.get("DB_STATEMENT_TIMEOUT", 15000))  # ms, Postgres; 0 disables
+DB_SQLITE_JOURNAL_MODE = os.environ.get("DB_SQLITE_JOURNAL_MODE", "WAL")
+DB_SQLITE_SYNCHRONOUS = os.environ.get("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+DB_SQLITE_BUSY_TIMEOUT = int(os.environ.get("DB_SQLITE_BUSY_TIMEOUT", 5000))  # ms
+DB_SQLITE_MMAP_SIZE = int(os.environ.get("DB_SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes
+DB_SQLITE_CACHE_SIZE = int(os.environ.get("DB_SQLITE_CACHE_SIZE", -64 * 1024))  # negative = KiB
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwtsecret")
+# bcrypt cost for new password hashes; older hashes are upgraded on login
+BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+# Seconds an admin record backing @require_role stays cached (app/services/authz.py)
+ADMIN_CACHE_TTL = int(os.environ.get("ADMIN_CACHE_TTL", 60))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
-ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
\ No newline at end of file
+ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
+
+# In-process response cache for read endpoints (app/services/cache.py)
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 512))
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 30))  # seconds
+# How often each worker re-reads the shared data_versions counters (seconds)
+DATA_VERSION_CHECK_INTERVAL = float(os.environ.get("DATA_VERSION_CHECK_INTERVAL", 1.0))
+
+# Per-route latency and SQL metrics at /api/metrics (app/services/metrics.py)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+# Static bearer token for Prometheus scrapes; otherwise an admin JWT is required
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Bulk feedback ingestion (/api/feedback/bulk)
+FEEDBACK_BULK_MAX_RECORDS = int(os.environ.get("FEEDBACK_BULK_MAX_RECORDS", 5000))
+FEEDBACK_BULK_CHUNK_SIZE = int(os.environ.get("FEEDBACK_BULK_CHUNK_SIZE", 500))
+
+# Write-behind feedback submission (app/services/write_behind.py)
+FEEDBACK_WRITE_BEHIND = os.environ.get("FEEDBACK_WRITE_BEHIND", "0") == "1"
+FEEDBACK_BUFFER_MAX_SIZE = int(os.environ.get("FEEDBACK_BUFFER_MAX_SIZE", 10000))
+FEEDBACK_BUFFER_BATCH_SIZE = int(os.environ.get("FEEDBACK_BUFFER_BATCH_SIZE", 500))
+FEEDBACK_BUFFER_FLUSH_INTERVAL = float(os.environ.get("FEEDBACK_BUFFER_FLUSH_INTERVAL", 0.5))  # seconds
+FEEDBACK_BUFFER_MAX_ATTEMPTS = int(os.environ.get("FEEDBACK_BUFFER_MAX_ATTEMPTS", 3))  # then row by row, failing rows dropped
+
+# Live dashboard stream (/api/dashboard/stream, app/services/live.py)
+LIVE_EVENT_HISTORY = int(os.environ.get("LIVE_EVENT_HISTORY", 1000))  # events kept for Last-Event-ID resume
+LIVE_HEARTBEAT_INTERVAL = float(os.environ.get("LIVE_HEARTBEAT_INTERVAL", 15))  # seconds
+# Open streams per worker. Each one holds a gunicorn thread (see Procfile), so
+# keep this well below GUNICORN_THREADS to leave threads for ordinary requests.
+LIVE_MAX_STREAMS = int(os.environ.get("LIVE_MAX_STREAMS", max(1, int(os.environ.get("GUNICORN_THREADS", 16)) // 4)))
+
+# Rows fetched per round trip by the streaming export
+FEEDBACK_EXPORT_BATCH_SIZE = int(os.environ.get("FEEDBACK_EXPORT_BATCH_SIZE", 1000))
+
+# Keyset pagination for the "No"-reason listings
+REASONS_PAGE_SIZE = int(os.environ.get("REASONS_PAGE_SIZE", 100))
+REASONS_MAX_PAGE_SIZE = int(os.environ.get("REASONS_MAX_PAGE_SIZE", 500))
+
+# Delta sync (/api/feedback/changes) page sizes
+FEEDBACK_CHANGES_PAGE_SIZE = int(os.environ.get("FEEDBACK_CHANGES_PAGE_SIZE", 500))
+FEEDBACK_CHANGES_MAX_PAGE_SIZE = int(os.environ.get("FEEDBACK_CHANGES_MAX_PAGE_SIZE", 5000))
+
+# Hourly trend buckets older than this are folded into daily buckets
+# by `flask compact-trend-buckets`
+TREND_HOURLY_RETENTION_HOURS = int(os.environ.get("TREND_HOURLY_RETENTION_HOURS", 72))
+
+# Canonical location hierarchy (app/services/location_registry.py):
+# {"Subcounty": {"Ward": ["Village", ...]}}. When the file exists, submissions
+# outside it are rejected; otherwise the registry is learned from the locations table.
+LOCATION_REGISTRY_PATH = os.environ.get("LOCATION_REGISTRY_PATH", os.path.join(BASE_DIR, "locations.json"))
+
+# Login admission control (app/services/login_guard.py)
+LOGIN_VERIFY_WORKERS = int(os.environ.get("LOGIN_VERIFY_WORKERS", 2))  # bcrypt threads per worker
+LOGIN_VERIFY_MAX_QUEUE = int(os.environ.get("LOGIN_VERIFY_MAX_QUEUE", 16))  # waiting logins before 429
+LOGIN_VERIFY_TIMEOUT = float(os.environ.get("LOGIN_VERIFY_TIMEOUT", 5.0))  # seconds
+LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", 10))
+LOGIN_IP_PER_MINUTE = float(os.environ.get("LOGIN_IP_PER_MINUTE", 10))
+LOGIN_USER_BURST = int(os.environ.get("LOGIN_USER_BURST", 5))
+LOGIN_USER_PER_MINUTE = float(os.environ.get("LOGIN_USER_PER_MINUTE", 5))
+# Reverse proxies in front of the app that append to X-Forwarded-For (1 on Render)
+LOGIN_TRUSTED_PROXIES = int(os.environ.get("LOGIN_TRUSTED_PROXIES", 0))
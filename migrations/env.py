@@ -51,6 +51,19 @@ def get_metadata():
     return target_db.metadata
 
 
+# Full-text search objects managed by hand in b7c2e9d5f013 (SQLite FTS5 table
+# and its shadow tables, Postgres tsvector column + GIN index). They are not
+# in the models, so autogenerate must not offer to drop them.
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("feedback_fts"):
+        return False
+    if type_ == "column" and name == "reason_tsv":
+        return False
+    if type_ == "index" and name == "ix_feedback_reason_tsv":
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +78,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +107,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,43 @@
+"""feedback rollups
+
+Revision ID: 3f9a1c7d2b64
+Revises: 228a62037a87
+Create Date: 2026-10-18 09:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2b64'
+down_revision = '228a62037a87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feedback_rollups',
+    sa.Column('subcounty', sa.String(length=100), nullable=False),
+    sa.Column('ward', sa.String(length=100), nullable=False),
+    sa.Column('village', sa.String(length=100), nullable=False),
+    sa.Column('age_bracket', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('yes_count', sa.Integer(), nullable=False),
+    sa.Column('no_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('subcounty', 'ward', 'village', 'age_bracket')
+    )
+
+    # Backfill from the responses collected so far
+    op.execute(
+        "INSERT INTO feedback_rollups "
+        "(subcounty, ward, village, age_bracket, total, yes_count, no_count) "
+        "SELECT subcounty, ward, village, age_bracket, COUNT(id), "
+        "SUM(CASE WHEN will_vote THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN will_vote THEN 0 ELSE 1 END) "
+        "FROM feedback GROUP BY subcounty, ward, village, age_bracket"
+    )
+
+
+def downgrade():
+    op.drop_table('feedback_rollups')
@@ -0,0 +1,31 @@
+"""data versions
+
+Revision ID: 5e7b0a3c9d21
+Revises: d41c8e2f7a90
+Create Date: 2026-10-18 12:41:53.902716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7b0a3c9d21'
+down_revision = 'd41c8e2f7a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_versions = op.create_table('data_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(data_versions, [
+        {'name': name, 'version': 0} for name in ('feedback', 'slides', 'hero', 'admins')
+    ])
+
+
+def downgrade():
+    op.drop_table('data_versions')
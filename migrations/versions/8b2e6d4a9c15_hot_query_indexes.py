@@ -0,0 +1,57 @@
+"""hot query indexes
+
+Revision ID: 8b2e6d4a9c15
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-18 10:03:27.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e6d4a9c15'
+down_revision = '3f9a1c7d2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_will_vote', ['will_vote'], unique=False)
+        batch_op.create_index('ix_feedback_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_feedback_location_vote', ['subcounty', 'ward', 'village', 'age_bracket', 'will_vote'], unique=False)
+
+    # Partial index for the "No"-reason listings (SQLite and Postgres both support WHERE)
+    no_reasons = sa.text('will_vote = false AND reason IS NOT NULL')
+    if op.get_bind().dialect.name == 'sqlite':
+        no_reasons = sa.text('will_vote = 0 AND reason IS NOT NULL')
+    op.create_index(
+        'ix_feedback_no_reasons', 'feedback', ['created_at', 'id'], unique=False,
+        sqlite_where=no_reasons, postgresql_where=no_reasons,
+    )
+
+    with op.batch_alter_table('feedback_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_rollups_ward', ['ward', 'village'], unique=False)
+        batch_op.create_index('ix_feedback_rollups_village', ['village'], unique=False)
+
+    with op.batch_alter_table('slides', schema=None) as batch_op:
+        batch_op.create_index('ix_slides_is_active', ['is_active', 'uploaded_at'], unique=False)
+        batch_op.create_index('ix_slides_uploaded_by', ['uploaded_by'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('slides', schema=None) as batch_op:
+        batch_op.drop_index('ix_slides_uploaded_by')
+        batch_op.drop_index('ix_slides_is_active')
+
+    with op.batch_alter_table('feedback_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_rollups_village')
+        batch_op.drop_index('ix_feedback_rollups_ward')
+
+    op.drop_index('ix_feedback_no_reasons', table_name='feedback')
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_location_vote')
+        batch_op.drop_index('ix_feedback_created_at')
+        batch_op.drop_index('ix_feedback_will_vote')
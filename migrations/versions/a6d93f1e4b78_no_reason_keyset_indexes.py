@@ -0,0 +1,41 @@
+"""no reason keyset indexes
+
+Revision ID: a6d93f1e4b78
+Revises: 5e7b0a3c9d21
+Create Date: 2026-10-18 14:05:39.117520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d93f1e4b78'
+down_revision = '5e7b0a3c9d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The summary counts moved to the rollups; left in place, this index only
+    # steers the planner away from the partial (created_at, id) index below.
+    op.drop_index('ix_feedback_will_vote', table_name='feedback')
+
+    no_reasons = sa.text('will_vote = false AND reason IS NOT NULL')
+    if op.get_bind().dialect.name == 'sqlite':
+        no_reasons = sa.text('will_vote = 0 AND reason IS NOT NULL')
+
+    op.create_index(
+        'ix_feedback_no_reasons_ward', 'feedback', ['ward', 'created_at', 'id'], unique=False,
+        sqlite_where=no_reasons, postgresql_where=no_reasons,
+    )
+    op.create_index(
+        'ix_feedback_no_reasons_village', 'feedback', ['village', 'created_at', 'id'], unique=False,
+        sqlite_where=no_reasons, postgresql_where=no_reasons,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_feedback_no_reasons_village', table_name='feedback')
+    op.drop_index('ix_feedback_no_reasons_ward', table_name='feedback')
+    op.create_index('ix_feedback_will_vote', 'feedback', ['will_vote'], unique=False)
@@ -0,0 +1,100 @@
+"""location name keys
+
+Revision ID: a91d3c5e7f20
+Revises: f2b6c8d4e173
+Create Date: 2026-10-19 10:21:36.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91d3c5e7f20'
+down_revision = 'f2b6c8d4e173'
+branch_labels = None
+depends_on = None
+
+LEVELS = ('subcounty', 'ward', 'village')
+KEYS = ('subcounty_key', 'ward_key', 'village_key')
+
+locations = sa.table('locations', sa.column('id'), *(sa.column(c) for c in LEVELS + KEYS))
+feedback = sa.table('feedback', sa.column('location_id'))
+# String-keyed counters: (table, location columns, other key columns, counter columns)
+COUNTERS = [
+    (sa.table('feedback_rollups', *(sa.column(c) for c in LEVELS + ('age_bracket', 'total', 'yes_count', 'no_count'))),
+     LEVELS, ('age_bracket',), ('total', 'yes_count', 'no_count')),
+    (sa.table('reason_terms', *(sa.column(c) for c in LEVELS + ('ngram', 'term', 'count'))),
+     LEVELS, ('ngram', 'term'), ('count',)),
+    (sa.table('feedback_buckets', *(sa.column(c) for c in ('granularity', 'bucket_start', 'subcounty', 'yes_count', 'no_count'))),
+     ('subcounty',), ('granularity', 'bucket_start'), ('yes_count', 'no_count')),
+]
+
+
+def normalize(name):
+    """Frozen copy of app/services/locations.py normalize at this revision."""
+    name = name.replace("-", " ").replace("'", "").replace("’", "")
+    return " ".join(name.split()).casefold()
+
+
+def _fold(table, location_columns, other_keys, counters, old, new):
+    """Add the counter rows keyed by the old names onto the new names, then delete them."""
+    bind = op.get_bind()
+    at = lambda names: [table.c[c] == names[c] for c in location_columns]
+    for row in bind.execute(sa.select(table).where(*at(old))).mappings().all():
+        updated = bind.execute(
+            table.update()
+            .where(*at(new), *(table.c[k] == row[k] for k in other_keys))
+            .values({c: table.c[c] + row[c] for c in counters})
+        ).rowcount
+        if not updated:
+            bind.execute(table.insert().values(dict(row, **{c: new[c] for c in location_columns})))
+    bind.execute(table.delete().where(*at(old)))
+
+
+def _merge_duplicates():
+    """Fold locations whose names normalize to the same key into the oldest one."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(locations.c.id, *(locations.c[c] for c in LEVELS)).order_by(locations.c.id)).all()
+
+    kept = {}
+    for row in rows:
+        names = dict(zip(LEVELS, row[1:]))
+        key = tuple(normalize(n) for n in row[1:])
+        if key not in kept:
+            kept[key] = (row.id, names)
+            continue
+
+        keep_id, keep_names = kept[key]
+        bind.execute(feedback.update().where(feedback.c.location_id == row.id).values(location_id=keep_id))
+        bind.execute(locations.delete().where(locations.c.id == row.id))
+        for table, location_columns, other_keys, counters in COUNTERS:
+            if any(names[c] != keep_names[c] for c in location_columns):
+                still_used = bind.execute(
+                    sa.select(locations.c.id).where(*(locations.c[c] == names[c] for c in location_columns)).limit(1)
+                ).first()
+                if still_used is None:
+                    _fold(table, location_columns, other_keys, counters, names, keep_names)
+
+    for key, (location_id, _) in kept.items():
+        bind.execute(locations.update().where(locations.c.id == location_id).values(dict(zip(KEYS, key))))
+
+
+def upgrade():
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        for column in KEYS:
+            batch_op.add_column(sa.Column(column, sa.String(length=100), nullable=True))
+
+    _merge_duplicates()
+
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        for column in KEYS:
+            batch_op.alter_column(column, existing_type=sa.String(length=100), nullable=False)
+        batch_op.create_unique_constraint('uq_locations_name_keys', list(KEYS))
+
+
+def downgrade():
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_locations_name_keys', type_='unique')
+        for column in reversed(KEYS):
+            batch_op.drop_column(column)
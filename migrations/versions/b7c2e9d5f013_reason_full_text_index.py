@@ -0,0 +1,64 @@
+"""reason full text index
+
+Revision ID: b7c2e9d5f013
+Revises: a6d93f1e4b78
+Create Date: 2026-10-18 15:32:10.640283
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c2e9d5f013'
+down_revision = 'a6d93f1e4b78'
+branch_labels = None
+depends_on = None
+
+# SQLite: external-content FTS5 table over feedback.reason, kept in sync by triggers
+SQLITE_FTS_TRIGGERS = [
+    """CREATE TRIGGER feedback_fts_ai AFTER INSERT ON feedback BEGIN
+        INSERT INTO feedback_fts(rowid, reason) VALUES (new.id, new.reason);
+    END""",
+    """CREATE TRIGGER feedback_fts_ad AFTER DELETE ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, reason) VALUES ('delete', old.id, old.reason);
+    END""",
+    """CREATE TRIGGER feedback_fts_au AFTER UPDATE OF reason ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, reason) VALUES ('delete', old.id, old.reason);
+        INSERT INTO feedback_fts(rowid, reason) VALUES (new.id, new.reason);
+    END""",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE feedback_fts USING fts5("
+            "reason, content='feedback', content_rowid='id', tokenize='porter unicode61')"
+        )
+        for trigger in SQLITE_FTS_TRIGGERS:
+            op.execute(trigger)
+        op.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        # Generated column: Postgres keeps it in sync on every insert/update
+        op.execute(
+            "ALTER TABLE feedback ADD COLUMN reason_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', coalesce(reason, ''))) STORED"
+        )
+        op.create_index('ix_feedback_reason_tsv', 'feedback', ['reason_tsv'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for name in ('feedback_fts_au', 'feedback_fts_ad', 'feedback_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS feedback_fts")
+
+    elif dialect == 'postgresql':
+        op.drop_index('ix_feedback_reason_tsv', table_name='feedback')
+        op.execute("ALTER TABLE feedback DROP COLUMN reason_tsv")
@@ -0,0 +1,75 @@
+"""reason terms
+
+Revision ID: c3f5a8b1e627
+Revises: b7c2e9d5f013
+Create Date: 2026-10-18 16:48:22.905341
+
+"""
+from collections import Counter
+from alembic import op
+import sqlalchemy as sa
+# Counted with the live tokenizer so the backfill matches what the write path adds
+from app.services.reason_terms import reason_ngrams
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f5a8b1e627'
+down_revision = 'b7c2e9d5f013'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+feedback = sa.table('feedback', sa.column('id'), sa.column('subcounty'), sa.column('ward'),
+                    sa.column('village'), sa.column('will_vote', sa.Boolean), sa.column('reason'))
+
+
+def _backfill(reason_terms):
+    """Count the terms and bigrams of every "No" reason collected so far."""
+    bind = op.get_bind()
+    counts = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(feedback.c.id, feedback.c.subcounty, feedback.c.ward, feedback.c.village, feedback.c.reason)
+            .where(feedback.c.will_vote == False, feedback.c.reason.isnot(None), feedback.c.id > last_id)
+            .order_by(feedback.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            terms, bigrams = reason_ngrams(row.reason)
+            for ngram, grams in ((1, terms), (2, bigrams)):
+                for term in grams:
+                    counts[(row.subcounty, row.ward, row.village, ngram, term)] += 1
+        last_id = rows[-1].id
+
+    items = [
+        dict(zip(('subcounty', 'ward', 'village', 'ngram', 'term'), key), count=count)
+        for key, count in counts.items()
+    ]
+    for start in range(0, len(items), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(reason_terms, items[start:start + BACKFILL_BATCH_SIZE])
+
+
+def upgrade():
+    reason_terms = op.create_table('reason_terms',
+    sa.Column('subcounty', sa.String(length=100), nullable=False),
+    sa.Column('ward', sa.String(length=100), nullable=False),
+    sa.Column('village', sa.String(length=100), nullable=False),
+    sa.Column('ngram', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('subcounty', 'ward', 'village', 'ngram', 'term')
+    )
+    with op.batch_alter_table('reason_terms', schema=None) as batch_op:
+        batch_op.create_index('ix_reason_terms_ngram', ['ngram', 'term', 'count'], unique=False)
+        batch_op.create_index('ix_reason_terms_ward', ['ward', 'village', 'ngram'], unique=False)
+        batch_op.create_index('ix_reason_terms_village', ['village', 'ngram'], unique=False)
+
+    _backfill(reason_terms)
+
+
+def downgrade():
+    op.drop_table('reason_terms')
@@ -0,0 +1,26 @@
+"""rollup counts index
+
+Revision ID: d41c8e2f7a90
+Revises: 8b2e6d4a9c15
+Create Date: 2026-10-18 11:20:06.318442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c8e2f7a90'
+down_revision = '8b2e6d4a9c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('feedback_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_rollups_counts', ['subcounty', 'total', 'yes_count', 'no_count'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feedback_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_rollups_counts')
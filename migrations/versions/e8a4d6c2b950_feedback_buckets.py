@@ -0,0 +1,77 @@
+"""feedback buckets
+
+Revision ID: e8a4d6c2b950
+Revises: c3f5a8b1e627
+Create Date: 2026-10-18 18:10:57.384016
+
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from alembic import op
+from flask import current_app
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a4d6c2b950'
+down_revision = 'c3f5a8b1e627'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+feedback = sa.table('feedback', sa.column('id'), sa.column('subcounty'),
+                    sa.column('will_vote', sa.Boolean), sa.column('created_at', sa.DateTime))
+
+
+def _backfill(buckets):
+    """
+    Bucket the responses collected so far: hourly inside the retention window,
+    daily before it (what `flask compact-trend-buckets` would leave behind).
+    """
+    bind = op.get_bind()
+    keep_hours = current_app.config.get('TREND_HOURLY_RETENTION_HOURS', 72)
+    cutoff = (datetime.utcnow() - timedelta(hours=keep_hours)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    yes, no = Counter(), Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(feedback.c.id, feedback.c.subcounty, feedback.c.will_vote, feedback.c.created_at)
+            .where(feedback.c.created_at.isnot(None), feedback.c.id > last_id)
+            .order_by(feedback.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            hour = row.created_at.replace(minute=0, second=0, microsecond=0)
+            key = ('hour', hour, row.subcounty) if hour >= cutoff else ('day', hour.replace(hour=0), row.subcounty)
+            (yes if row.will_vote else no)[key] += 1
+        last_id = rows[-1].id
+
+    items = [
+        dict(zip(('granularity', 'bucket_start', 'subcounty'), key), yes_count=yes[key], no_count=no[key])
+        for key in yes.keys() | no.keys()
+    ]
+    for start in range(0, len(items), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(buckets, items[start:start + BACKFILL_BATCH_SIZE])
+
+
+def upgrade():
+    buckets = op.create_table('feedback_buckets',
+    sa.Column('granularity', sa.String(length=5), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('subcounty', sa.String(length=100), nullable=False),
+    sa.Column('yes_count', sa.Integer(), nullable=False),
+    sa.Column('no_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('granularity', 'bucket_start', 'subcounty')
+    )
+    with op.batch_alter_table('feedback_buckets', schema=None) as batch_op:
+        batch_op.create_index('ix_feedback_buckets_start', ['bucket_start', 'subcounty'], unique=False)
+
+    _backfill(buckets)
+
+
+def downgrade():
+    op.drop_table('feedback_buckets')
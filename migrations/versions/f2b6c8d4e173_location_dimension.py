@@ -0,0 +1,160 @@
+"""location dimension
+
+Revision ID: f2b6c8d4e173
+Revises: e8a4d6c2b950
+Create Date: 2026-10-18 21:47:03.512894
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6c8d4e173'
+down_revision = 'e8a4d6c2b950'
+branch_labels = None
+depends_on = None
+
+# Rows per UPDATE while backfilling (keeps each statement's undo/WAL bounded)
+BACKFILL_CHUNK_SIZE = 20000
+
+# Rebuilding feedback in batch mode (SQLite) drops its triggers; these are the
+# FTS sync triggers from b7c2e9d5f013
+SQLITE_FTS_TRIGGERS = [
+    """CREATE TRIGGER feedback_fts_ai AFTER INSERT ON feedback BEGIN
+        INSERT INTO feedback_fts(rowid, reason) VALUES (new.id, new.reason);
+    END""",
+    """CREATE TRIGGER feedback_fts_ad AFTER DELETE ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, reason) VALUES ('delete', old.id, old.reason);
+    END""",
+    """CREATE TRIGGER feedback_fts_au AFTER UPDATE OF reason ON feedback BEGIN
+        INSERT INTO feedback_fts(feedback_fts, rowid, reason) VALUES ('delete', old.id, old.reason);
+        INSERT INTO feedback_fts(rowid, reason) VALUES (new.id, new.reason);
+    END""",
+]
+
+
+def _no_reasons():
+    if op.get_bind().dialect.name == 'sqlite':
+        return sa.text('will_vote = 0 AND reason IS NOT NULL')
+    return sa.text('will_vote = false AND reason IS NOT NULL')
+
+
+def _in_chunks(statement):
+    """Run an UPDATE over feedback one id range at a time."""
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text('SELECT MAX(id) FROM feedback')).scalar() or 0
+    for start in range(0, max_id, BACKFILL_CHUNK_SIZE):
+        bind.execute(
+            sa.text(statement + ' WHERE feedback.id > :start AND feedback.id <= :end'),
+            {'start': start, 'end': start + BACKFILL_CHUNK_SIZE},
+        )
+
+
+def _recreate_fts_triggers():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name in ('feedback_fts_au', 'feedback_fts_ad', 'feedback_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for trigger in SQLITE_FTS_TRIGGERS:
+        op.execute(trigger)
+
+
+def upgrade():
+    op.create_table('locations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subcounty', sa.String(length=100), nullable=False),
+    sa.Column('ward', sa.String(length=100), nullable=False),
+    sa.Column('village', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subcounty', 'ward', 'village', name='uq_locations_subcounty_ward_village')
+    )
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.create_index('ix_locations_ward', ['ward', 'village'], unique=False)
+        batch_op.create_index('ix_locations_village', ['village'], unique=False)
+
+    op.execute(
+        "INSERT INTO locations (subcounty, ward, village) "
+        "SELECT DISTINCT subcounty, ward, village FROM feedback "
+        "ORDER BY subcounty, ward, village"
+    )
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+
+    _in_chunks(
+        "UPDATE feedback SET location_id = ("
+        "SELECT locations.id FROM locations "
+        "WHERE locations.subcounty = feedback.subcounty "
+        "AND locations.ward = feedback.ward "
+        "AND locations.village = feedback.village)"
+    )
+
+    op.drop_index('ix_feedback_no_reasons_village', table_name='feedback')
+    op.drop_index('ix_feedback_no_reasons_ward', table_name='feedback')
+    op.drop_index('ix_feedback_no_reasons', table_name='feedback')
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_location_vote')
+        batch_op.alter_column('location_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_feedback_location_id', 'locations', ['location_id'], ['id'])
+        batch_op.drop_column('village')
+        batch_op.drop_column('ward')
+        batch_op.drop_column('subcounty')
+        batch_op.create_index('ix_feedback_location_vote', ['location_id', 'age_bracket', 'will_vote'], unique=False)
+
+    op.create_index(
+        'ix_feedback_no_reasons', 'feedback', ['created_at', 'id'], unique=False,
+        sqlite_where=_no_reasons(), postgresql_where=_no_reasons(),
+    )
+    op.create_index(
+        'ix_feedback_no_reasons_location', 'feedback', ['location_id', 'created_at', 'id'], unique=False,
+        sqlite_where=_no_reasons(), postgresql_where=_no_reasons(),
+    )
+    _recreate_fts_triggers()
+
+
+def downgrade():
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subcounty', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('ward', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('village', sa.String(length=100), nullable=True))
+
+    _in_chunks(
+        "UPDATE feedback SET "
+        "subcounty = (SELECT locations.subcounty FROM locations WHERE locations.id = feedback.location_id), "
+        "ward = (SELECT locations.ward FROM locations WHERE locations.id = feedback.location_id), "
+        "village = (SELECT locations.village FROM locations WHERE locations.id = feedback.location_id)"
+    )
+
+    op.drop_index('ix_feedback_no_reasons_location', table_name='feedback')
+    op.drop_index('ix_feedback_no_reasons', table_name='feedback')
+
+    with op.batch_alter_table('feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_feedback_location_vote')
+        batch_op.drop_constraint('fk_feedback_location_id', type_='foreignkey')
+        batch_op.drop_column('location_id')
+        batch_op.alter_column('subcounty', existing_type=sa.String(length=100), nullable=False)
+        batch_op.alter_column('ward', existing_type=sa.String(length=100), nullable=False)
+        batch_op.alter_column('village', existing_type=sa.String(length=100), nullable=False)
+        batch_op.create_index('ix_feedback_location_vote', ['subcounty', 'ward', 'village', 'age_bracket', 'will_vote'], unique=False)
+
+    op.create_index(
+        'ix_feedback_no_reasons', 'feedback', ['created_at', 'id'], unique=False,
+        sqlite_where=_no_reasons(), postgresql_where=_no_reasons(),
+    )
+    op.create_index(
+        'ix_feedback_no_reasons_ward', 'feedback', ['ward', 'created_at', 'id'], unique=False,
+        sqlite_where=_no_reasons(), postgresql_where=_no_reasons(),
+    )
+    op.create_index(
+        'ix_feedback_no_reasons_village', 'feedback', ['village', 'created_at', 'id'], unique=False,
+        sqlite_where=_no_reasons(), postgresql_where=_no_reasons(),
+    )
+    _recreate_fts_triggers()
+
+    with op.batch_alter_table('locations', schema=None) as batch_op:
+        batch_op.drop_index('ix_locations_village')
+        batch_op.drop_index('ix_locations_ward')
+
+    op.drop_table('locations')
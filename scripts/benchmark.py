@@ -0,0 +1,360 @@
+# scripts/benchmark.py
+"""
+API benchmark suite.
+- Builds the app through create_app() against a seeded SQLite database per
+  dataset size (default 10k, 100k and 1M feedback rows), cached in --workdir
+  so later runs reuse them. Data comes from `flask seed` (app/services/seed.py)
+  over its synthetic 4 x 4 x 8 location tree, written to a ".partial" file
+  that only replaces bench-<rows>.db once seeding succeeded.
+- Each size runs in its own Python process, so no module-level state
+  (location ids, the registry, data versions, the response cache) leaks
+  from one database into the next.
+- Drives every endpoint in ENDPOINTS (the ones left out are listed in
+  EXCLUDED) with the Flask test client, first one request at a time, then
+  from --concurrency threads at once.
+- Reports p50/p95/p99 latency (ms) and throughput (requests/s), and writes
+  everything to a JSON file so runs can be compared across commits.
+
+Usage:
+    python scripts/benchmark.py --sizes 10000,100000 --requests 200 --out bench.json
+    python scripts/benchmark.py --sizes 10000 --out after.json --compare bench.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Go one folder up from /scripts to the project root (where /app lives)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+# (name, method, path, needs admin token, json body)
+ENDPOINTS = [
+    ("dashboard.summary", "GET", "/api/dashboard/summary", False, None),
+    ("dashboard.overview", "GET", "/api/dashboard/overview", False, None),
+    ("dashboard.by_subcounty", "GET", "/api/dashboard/by-subcounty", False, None),
+    ("dashboard.by_ward", "GET", "/api/dashboard/by-ward", False, None),
+    ("dashboard.by_village", "GET", "/api/dashboard/by-village", False, None),
+    ("dashboard.aggregate", "GET", "/api/dashboard/aggregate?dims=subcounty,ward,age_bracket", False, None),
+    ("dashboard.pivot", "GET", "/api/dashboard/pivot?by=ward", False, None),
+    ("dashboard.quick_stats", "GET", "/api/dashboard/quick-stats", False, None),
+    ("dashboard.no_reasons", "GET", "/api/dashboard/no-reasons?limit=100", False, None),
+    ("dashboard.no_reasons_by_ward", "GET", "/api/dashboard/no-reasons?ward=Ward%201.1&limit=100", False, None),
+    ("dashboard.reason_terms", "GET", "/api/dashboard/reason-terms", False, None),
+    ("dashboard.trend", "GET", "/api/dashboard/trend?interval=day", False, None),
+    ("dashboard.cache_stats", "GET", "/api/dashboard/cache-stats", True, None),
+    ("dashboard.pool_stats", "GET", "/api/dashboard/pool-stats", True, None),
+    ("dashboard.stream_stats", "GET", "/api/dashboard/stream-stats", True, None),
+    ("feedback.summary", "GET", "/api/feedback/summary", False, None),
+    ("feedback.by_region", "GET", "/api/feedback/by-region", False, None),
+    ("feedback.reasons", "GET", "/api/feedback/reasons?limit=100", False, None),
+    ("feedback.search", "GET", "/api/feedback/search?q=id%20card", False, None),
+    ("feedback.changes", "GET", "/api/feedback/changes?since=0&limit=500", True, None),
+    ("feedback.changes_aggregate", "GET", "/api/feedback/changes?since=0&limit=500&view=aggregate", True, None),
+    ("feedback.export_village", "GET", "/api/feedback/export?format=ndjson&village=Village%204.4.8", True, None),
+    ("feedback.buffer_stats", "GET", "/api/feedback/buffer-stats", True, None),
+    ("hero.get", "GET", "/api/hero/hero", False, None),
+    ("slides.all", "GET", "/api/slides/", False, None),
+    ("slides.active", "GET", "/api/slides/active", False, None),
+    ("admin.all", "GET", "/api/admin/all", True, None),
+    ("auth.verify", "GET", "/api/auth/verify", True, None),
+    ("metrics", "GET", "/api/metrics", True, None),
+    # One bcrypt check per request; the login throttle is lifted in build_env()
+    ("auth.login", "POST", "/api/auth/login", False, {"username": "bench-super", "password": "bench-password"}),
+    # Writes last: they invalidate the cached reads above
+    ("feedback.submit", "POST", "/api/feedback/submit", False, {
+        "subcounty": "Subcounty 1", "ward": "Ward 1.1", "village": "Village 1.1.1",
+        "age_bracket": "18-28", "will_vote": "No", "reason": "No ID card yet",
+    }),
+    ("feedback.bulk", "POST", "/api/feedback/bulk", False, {"records": [
+        {"subcounty": f"Subcounty {s}", "ward": f"Ward {s}.{w}", "village": f"Village {s}.{w}.{v}",
+         "age_bracket": "29-40", "will_vote": "Yes" if v % 2 else "No", "reason": None if v % 2 else "Too far"}
+        for s in range(1, 5) for w in range(1, 5) for v in range(1, 5)
+    ]}),
+]
+
+# Endpoints left out on purpose, with the reason
+EXCLUDED = {
+    "GET /api/dashboard/stream": "Server-Sent Events: the response never ends, so there is no latency to measure",
+    "GET /": "static index page, not part of the API",
+    "POST /api/hero/hero": "admin-only configuration change, not a hot path",
+    "POST /api/admin/add, DELETE /api/admin/<id>": "admin account management, changes what the other endpoints return",
+    "PATCH /api/admin/change-password, POST /api/auth/change-password": "rehashes the benchmark admin's password",
+    "POST /api/slides/upload, DELETE /api/slides/<id>, PATCH /api/slides/<id>/toggle":
+        "admin-only slide management, changes what the slide endpoints return",
+}
+
+SEED_LOCATIONS = "4,4,8"  # subcounties,wards,villages of the synthetic tree
+SEED_SLIDES = 12
+
+
+def seed(app, rows, random_seed=42):
+    """Fill the database through `flask seed`, after adding the admin the slides are credited to."""
+    from app.database import db
+    from app.models import Admin, HeroImage
+
+    with app.app_context():
+        # hero_image predates the migrations and no revision creates it
+        HeroImage.__table__.create(db.engine, checkfirst=True)
+        db.session.add(HeroImage(image_url="https://example.com/hero.jpg"))
+        db.session.add(Admin("bench-super", "bench-password", "superadmin"))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=[
+        "seed", "--count", str(rows), "--seed", str(random_seed),
+        "--locations", SEED_LOCATIONS, "--slides", str(SEED_SLIDES),
+    ])
+    print(result.output.rstrip())
+    if result.exit_code != 0:
+        raise RuntimeError(f"flask seed failed: {result.exception!r}")
+
+
+def build_env(db_path, cache):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "1" if cache else "0"
+    os.environ["LOCATION_REGISTRY_PATH"] = ""  # the endpoints above use the synthetic names
+    # Every auth.login request comes from the same client and user
+    for name in ("LOGIN_IP_BURST", "LOGIN_IP_PER_MINUTE", "LOGIN_USER_BURST", "LOGIN_USER_PER_MINUTE"):
+        os.environ[name] = "1000000"
+
+
+def create_database(db_path, rows):
+    """Migrate and seed a new database at db_path (run in its own process)."""
+    build_env(db_path, cache=False)
+
+    from flask_migrate import upgrade
+    from app import create_app
+    from app.database import db
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+    seed(app, rows)
+    with app.app_context():
+        db.engine.dispose()  # checkpoint and close the WAL before the file is moved
+
+
+def ensure_database(db_path, rows):
+    """Seed bench-<rows>.db unless a complete one exists; an interrupted seed leaves only the .partial file."""
+    if os.path.exists(db_path):
+        return
+    partial = db_path + ".partial"
+    for leftover in (partial, partial + "-wal", partial + "-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    print(f"Creating {db_path} with {rows} rows")
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--sizes", str(rows), "--seed-out", partial],
+        check=True,
+    )
+    os.replace(partial, db_path)
+
+
+def build_app(db_path, cache):
+    build_env(db_path, cache)
+
+    from app import create_app
+
+    return create_app()
+
+
+def admin_token(app):
+    from flask_jwt_extended import create_access_token
+    from app.models import Admin
+
+    with app.app_context():
+        admin = Admin.query.filter_by(username="bench-super").first()
+        return create_access_token(
+            identity=admin.username, additional_claims={"id": admin.id, "role": admin.role}
+        )
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = math.ceil(p / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _request(client, method, path, headers, body):
+    started = time.perf_counter()
+    response = client.open(path, method=method, headers=headers, json=body)
+    response.get_data()  # drain streaming responses
+    return time.perf_counter() - started, response.status_code
+
+
+def _summary(latencies, statuses, wall):
+    latencies = sorted(latencies)
+    errors = sum(1 for s in statuses if s >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(s): statuses.count(s) for s in sorted(set(statuses))},
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+    }
+
+
+def run_sequential(app, method, path, headers, body, requests, warmup):
+    client = app.test_client()
+    for _ in range(warmup):
+        _request(client, method, path, headers, body)
+
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    for _ in range(requests):
+        elapsed, status = _request(client, method, path, headers, body)
+        latencies.append(elapsed)
+        statuses.append(status)
+    return _summary(latencies, statuses, time.perf_counter() - started)
+
+
+def run_concurrent(app, method, path, headers, body, requests, concurrency):
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        return _request(local.client, method, path, headers, body)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return _summary([r[0] for r in results], [r[1] for r in results], wall)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print p50/p95 and throughput changes against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = {(r["rows"], r["endpoint"], r["mode"]): r for r in json.load(f)["results"]}
+
+    print(f"Compared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["rows"], r["endpoint"], r["mode"]))
+        if old is None:
+            continue
+        change = lambda key: (r[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        print(f"{r['rows']:>8} {r['endpoint']:<32} {r['mode']:<10} p50 {change('p50_ms'):+7.1f}%  "
+              f"p95 {change('p95_ms'):+7.1f}%  throughput {change('throughput_rps'):+7.1f}%")
+
+
+def run_size(args, rows, endpoints):
+    app = build_app(database_path(args, rows), args.cache)
+    auth = {"Authorization": f"Bearer {admin_token(app)}"}
+
+    results = []
+    for name, method, path, needs_auth, body in endpoints:
+        headers = auth if needs_auth else {}
+        runs = [("sequential", run_sequential(app, method, path, headers, body, args.requests, args.warmup))]
+        if args.concurrency:
+            runs.append(("concurrent", run_concurrent(app, method, path, headers, body, args.requests, args.concurrency)))
+
+        for mode, summary in runs:
+            results.append(dict(rows=rows, endpoint=name, mode=mode, **summary))
+            print(f"{rows:>8} {name:<32} {mode:<10} p50={summary['p50_ms']:>9.2f}ms "
+                  f"p95={summary['p95_ms']:>9.2f}ms p99={summary['p99_ms']:>9.2f}ms "
+                  f"{summary['throughput_rps']:>8} req/s errors={summary['errors']}", flush=True)
+    return results
+
+
+def database_path(args, rows):
+    return os.path.join(args.workdir, f"bench-{rows}.db")
+
+
+def run_size_in_subprocess(rows):
+    """Benchmark one dataset size in a fresh interpreter and return its results."""
+    fd, out = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        # Later flags win, so the child keeps every option but sees one size
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--sizes", str(rows), "--worker-out", out],
+            check=True,
+        )
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated feedback row counts.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint and mode.")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each sequential run.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads in the concurrent run (0 to skip).")
+    parser.add_argument("--endpoints", default="", help="Comma-separated endpoint names (default: all).")
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache on (default: off).")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "portfolio-bench"), help="Where the seeded databases live.")
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file.")
+    parser.add_argument("--compare", help="Earlier JSON results file to compare against.")
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)  # internal: one size per subprocess
+    parser.add_argument("--seed-out", help=argparse.SUPPRESS)  # internal: seed one size into this file
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    wanted = {e for e in args.endpoints.split(",") if e}
+    endpoints = [e for e in ENDPOINTS if not wanted or e[0] in wanted]
+    os.makedirs(args.workdir, exist_ok=True)
+
+    if args.seed_out:
+        create_database(args.seed_out, sizes[0])
+        return
+
+    if args.worker_out:
+        results = run_size(args, sizes[0], endpoints)
+        with open(args.worker_out, "w") as f:
+            json.dump(results, f)
+        return
+
+    started_at = datetime.utcnow().isoformat()
+    results = []
+    for rows in sizes:
+        ensure_database(database_path(args, rows), rows)
+        results.extend(run_size_in_subprocess(rows))
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": started_at,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "response_cache": args.cache,
+            "excluded": EXCLUDED,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from getpass import getpass
 from app import create_app
 from app.database import db
 from app.models import Admin
+from app.services.cache import mark_changed
 
 def prompt_or_env(env_key, prompt_text, secret=False):
     val = os.environ.get(env_key)
@@ -30,6 +31,7 @@ def create_if_not_exists(username, password, role="admin"):
         return existing
     u = Admin(username=username, password=password, role=role)
     db.session.add(u)
+    mark_changed("admins")
     db.session.commit()
     print(f"[created] {role} '{username}'")
     return u